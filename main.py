@@ -66,8 +66,7 @@ def main() -> None:
         app.run()
     else:
         orchestrator = DependencyDiffOrchestrator(max_workers=args.jobs)
-        report = orchestrator.process_requirements_diff(diff_input)
-        print(report)
+        orchestrator.stream_requirements_diff(diff_input, sys.stdout)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+import os
+import pathlib
+
+
+def cache_dir() -> pathlib.Path:
+    """
+    Returns the root directory for persistent depdiff caches.
+
+    Honours $DEPDIFF_CACHE_DIR if set, otherwise uses $XDG_CACHE_HOME/depdiff
+    and falls back to ~/.cache/depdiff. The directory is not created.
+    """
+    override = os.environ.get("DEPDIFF_CACHE_DIR")
+    if override:
+        return pathlib.Path(override)
+
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache_home:
+        return pathlib.Path(xdg_cache_home) / "depdiff"
+
+    return pathlib.Path.home() / ".cache" / "depdiff"
@@ -1,200 +1,270 @@
+import io
 import pathlib
+import sys
 import difflib
-from typing import Set
+import tarfile
+import zipfile
+from typing import IO, Dict, List, Optional, Set
+
+# Number of leading bytes inspected for null bytes when sniffing binary files
+_BINARY_SNIFF_SIZE = 8192
+
+# Files with more lines than this keep difflib's autojunk heuristic enabled
+_AUTOJUNK_MIN_LINES = 20000
 
 
 class SourceComparator:
     """
-    Compares two source directories to generate a unified diff.
+    Compares the contents of two package archives to generate a unified diff.
     Acts as a fallback engine when Git native diff is not available.
     """
 
-    def compare_directories(self, old_dir: pathlib.Path, new_dir: pathlib.Path) -> str:
+    def compare_archives(
+        self, old_archive: pathlib.Path, new_archive: pathlib.Path
+    ) -> str:
         """
-        Recursively compares two directories and generates a unified diff.
+        Compares the contents of two sdist or wheel archives.
+
+        Members are read straight from the archives, so nothing is extracted
+        to disk. Files only in the old archive are listed first, then files
+        only in the new one, then modified files, each group sorted by path.
+        Binary files are left out.
 
         Args:
-            old_dir: Path to the directory containing the old version.
-            new_dir: Path to the directory containing the new version.
+            old_archive: Path to the archive of the old version.
+            new_archive: Path to the archive of the new version.
 
         Returns:
-            A string containing the unified diff of the directory contents.
+            A string containing the unified diff of the archive contents.
         """
-        # Collect all files from both directories
-        old_files = self._collect_files(old_dir)
-        new_files = self._collect_files(new_dir)
-
-        # Get relative paths for comparison
-        old_rel_files = {f.relative_to(old_dir) for f in old_files}
-        new_rel_files = {f.relative_to(new_dir) for f in new_files}
-
-        # Determine file changes
-        deleted_files = old_rel_files - new_rel_files
-        added_files = new_rel_files - old_rel_files
-        common_files = old_rel_files & new_rel_files
-
-        diff_lines: list[str] = []
-
-        # Process deleted files
-        for rel_path in sorted(deleted_files):
-            old_file = old_dir / rel_path
-            if not self._is_binary(old_file):
-                diff_lines.extend(self._generate_deletion_diff(rel_path, old_file))
-
-        # Process added files
-        for rel_path in sorted(added_files):
-            new_file = new_dir / rel_path
-            if not self._is_binary(new_file):
-                diff_lines.extend(self._generate_addition_diff(rel_path, new_file))
-
-        # Process modified files
-        for rel_path in sorted(common_files):
-            old_file = old_dir / rel_path
-            new_file = new_dir / rel_path
-
-            # Skip if either is binary
-            if self._is_binary(old_file) or self._is_binary(new_file):
+        old_files = self._read_archive(old_archive)
+        new_files = self._read_archive(new_archive)
+
+        output = io.StringIO()
+
+        # Deleted, added, then modified. Binary members are None.
+        for rel_path in sorted(old_files.keys() - new_files.keys()):
+            old_data = old_files[rel_path]
+            if old_data is not None:
+                self._generate_deletion_diff(output, rel_path, old_data)
+
+        for rel_path in sorted(new_files.keys() - old_files.keys()):
+            new_data = new_files[rel_path]
+            if new_data is not None:
+                self._generate_addition_diff(output, rel_path, new_data)
+
+        for rel_path in sorted(old_files.keys() & new_files.keys()):
+            old_data = old_files[rel_path]
+            new_data = new_files[rel_path]
+            if old_data is None or new_data is None or old_data == new_data:
                 continue
+            self._generate_file_diff(output, rel_path, old_data, new_data)
 
-            # Compare file contents
-            diff = self._generate_file_diff(rel_path, old_file, new_file)
-            if diff:
-                diff_lines.extend(diff)
+        return output.getvalue()
 
-        return "\n".join(diff_lines)
-
-    def _is_binary(self, file_path: pathlib.Path) -> bool:
+    def _read_archive(self, archive: pathlib.Path) -> Dict[str, Optional[bytes]]:
         """
-        Determines if a file is binary by checking for null bytes.
-
-        Args:
-            file_path: Path to the file to check.
+        Reads the regular files of an archive into memory.
 
-        Returns:
-            True if the file appears to be binary, False otherwise.
-        """
-        try:
-            # Read first 8KB to check for null bytes
-            with open(file_path, "rb") as f:
-                chunk = f.read(8192)
-                return b"\x00" in chunk
-        except Exception:
-            # If we can't read it, treat it as binary
-            return True
-
-    def _collect_files(self, directory: pathlib.Path) -> Set[pathlib.Path]:
-        """
-        Recursively collects all files in a directory.
+        Wheels (.whl, .zip) are read as zip files and anything else as a
+        compressed tarball, in a single streaming pass. As with an extracted
+        sdist, if the archive holds exactly one top-level directory, paths are
+        made relative to it and files outside it are dropped.
 
         Args:
-            directory: The directory to scan.
+            archive: Path to the archive.
 
         Returns:
-            Set of absolute paths to all files in the directory.
+            Mapping of relative "/"-separated paths to file contents, with
+            None for binary files.
         """
-        files: Set[pathlib.Path] = set()
-        for item in directory.rglob("*"):
-            if item.is_file():
-                files.add(item)
-        return files
+        files: Dict[str, Optional[bytes]] = {}
+        top_dirs: Set[str] = set()
+
+        def add(name: str, is_dir: bool, f: Optional[IO[bytes]]) -> None:
+            rel_path = _normalize_member_name(name)
+            if not rel_path:
+                return
+            top, sep, _ = rel_path.partition("/")
+            if sep or is_dir:
+                top_dirs.add(top)
+            if f is not None:
+                files[rel_path] = _read_if_text_stream(f)
+
+        if archive.suffix in (".whl", ".zip"):
+            with zipfile.ZipFile(archive) as zip_ref:
+                for info in zip_ref.infolist():
+                    if info.is_dir():
+                        add(info.filename, True, None)
+                        continue
+                    with zip_ref.open(info) as f:
+                        add(info.filename, False, f)
+        else:
+            with tarfile.open(archive, "r|*") as tar:
+                for member in tar:
+                    if member.isdir():
+                        add(member.name, True, None)
+                    elif member.isfile():
+                        add(member.name, False, tar.extractfile(member))
+                    # Links and special files have no contents of their own
+                    # and are skipped
+
+        if len(top_dirs) != 1:
+            return files
+
+        prefix = top_dirs.pop() + "/"
+        return {
+            rel_path[len(prefix) :]: data
+            for rel_path, data in files.items()
+            if rel_path.startswith(prefix)
+        }
 
     def _generate_deletion_diff(
-        self, rel_path: pathlib.Path, old_file: pathlib.Path
-    ) -> list[str]:
+        self, buf: io.StringIO, rel_path: str, old_data: bytes
+    ) -> None:
         """
-        Generates a unified diff for a deleted file.
+        Writes a unified diff for a deleted file.
 
         Args:
+            buf: Buffer to write the diff lines to.
             rel_path: Relative path of the file.
-            old_file: Absolute path to the old file.
-
-        Returns:
-            List of diff lines.
+            old_data: Contents of the old file.
         """
-        lines: list[str] = []
-        lines.append(f"--- a/{rel_path}")
-        lines.append("+++ /dev/null")
+        buf.write(f"--- a/{rel_path}\n+++ /dev/null\n")
 
-        try:
-            with open(old_file, "r", encoding="utf-8", errors="replace") as f:
-                old_content = f.readlines()
+        for line in _split_lines(old_data):
+            buf.write(f"-{line.rstrip()}\n")
 
-            for line in old_content:
-                lines.append(f"-{line.rstrip()}")
+    def _generate_addition_diff(
+        self, buf: io.StringIO, rel_path: str, new_data: bytes
+    ) -> None:
+        """
+        Writes a unified diff for an added file.
 
-        except Exception:
-            pass
+        Args:
+            buf: Buffer to write the diff lines to.
+            rel_path: Relative path of the file.
+            new_data: Contents of the new file.
+        """
+        buf.write(f"--- /dev/null\n+++ b/{rel_path}\n")
 
-        return lines
+        for line in _split_lines(new_data):
+            buf.write(f"+{line.rstrip()}\n")
 
-    def _generate_addition_diff(
-        self, rel_path: pathlib.Path, new_file: pathlib.Path
-    ) -> list[str]:
+    def _generate_file_diff(
+        self, buf: io.StringIO, rel_path: str, old_data: bytes, new_data: bytes
+    ) -> None:
         """
-        Generates a unified diff for an added file.
+        Writes a unified diff for a modified file.
+
+        Produces the same output as difflib.unified_diff with three lines of
+        context, written straight to the buffer. Nothing is written if the
+        files have the same lines.
 
         Args:
+            buf: Buffer to write the diff lines to.
             rel_path: Relative path of the file.
-            new_file: Absolute path to the new file.
-
-        Returns:
-            List of diff lines.
+            old_data: Contents of the old version.
+            new_data: Contents of the new version.
         """
-        lines: list[str] = []
-        lines.append("--- /dev/null")
-        lines.append(f"+++ b/{rel_path}")
+        # Interning lets the matcher compare repeated lines (blank lines,
+        # closing brackets, ...) by identity rather than by content
+        old_content = [sys.intern(line) for line in _split_lines(old_data)]
+        new_content = [sys.intern(line) for line in _split_lines(new_data)]
+
+        # The autojunk heuristic treats lines that appear often (such as blank
+        # lines) as junk, which gives worse diffs for source code. Only keep
+        # it for very large files, where it bounds the matching cost.
+        matcher = difflib.SequenceMatcher(
+            None,
+            old_content,
+            new_content,
+            autojunk=len(new_content) > _AUTOJUNK_MIN_LINES,
+        )
+
+        started = False
+        for group in matcher.get_grouped_opcodes(3):
+            if not started:
+                started = True
+                buf.write(f"--- a/{rel_path}\n+++ b/{rel_path}\n")
+
+            first, last = group[0], group[-1]
+            old_range = _format_range_unified(first[1], last[2])
+            new_range = _format_range_unified(first[3], last[4])
+            buf.write(f"@@ -{old_range} +{new_range} @@\n")
+
+            for tag, i1, i2, j1, j2 in group:
+                if tag == "equal":
+                    for line in old_content[i1:i2]:
+                        buf.write(f" {line}\n")
+                    continue
+                if tag in ("replace", "delete"):
+                    for line in old_content[i1:i2]:
+                        buf.write(f"-{line}\n")
+                if tag in ("replace", "insert"):
+                    for line in new_content[j1:j2]:
+                        buf.write(f"+{line}\n")
+
+
+def _read_if_text_stream(f: IO[bytes]) -> Optional[bytes]:
+    """
+    Reads a file object's contents unless it looks binary.
 
-        try:
-            with open(new_file, "r", encoding="utf-8", errors="replace") as f:
-                new_content = f.readlines()
+    Args:
+        f: The file object to read.
 
-            for line in new_content:
-                lines.append(f"+{line.rstrip()}")
+    Returns:
+        The contents, or None if a null byte appears in the first 8KB.
+    """
+    chunk = f.read(_BINARY_SNIFF_SIZE)
+    if chunk.find(b"\x00") != -1:
+        return None
+    return chunk + f.read()
 
-        except Exception:
-            pass
 
-        return lines
+def _split_lines(data: bytes) -> List[str]:
+    """
+    Decodes file contents and splits them into lines.
 
-    def _generate_file_diff(
-        self, rel_path: pathlib.Path, old_file: pathlib.Path, new_file: pathlib.Path
-    ) -> list[str]:
-        """
-        Generates a unified diff for a modified file.
+    Only "\\n", "\\r\\n" and "\\r" end a line, as with readlines() on a file
+    opened in text mode. str.splitlines would also split on form feeds and
+    Unicode line separators, which would show as extra lines in the diff.
 
-        Args:
-            rel_path: Relative path of the file.
-            old_file: Absolute path to the old version.
-            new_file: Absolute path to the new version.
+    Args:
+        data: The raw file contents.
 
-        Returns:
-            List of diff lines, or empty list if files are identical.
-        """
-        try:
-            with open(old_file, "r", encoding="utf-8", errors="replace") as f:
-                old_content = f.readlines()
-
-            with open(new_file, "r", encoding="utf-8", errors="replace") as f:
-                new_content = f.readlines()
-
-            # Generate unified diff
-            diff = difflib.unified_diff(
-                old_content,
-                new_content,
-                fromfile=f"a/{rel_path}",
-                tofile=f"b/{rel_path}",
-                lineterm="",
-            )
-
-            # Strip newlines from each line since readlines() includes them
-            # and we'll be joining with newlines later
-            diff_lines = [line.rstrip("\n") for line in diff]
-
-            # Only return if there are actual changes (more than just headers)
-            if len(diff_lines) > 2:
-                return diff_lines
-
-            return []
-
-        except Exception:
-            return []
+    Returns:
+        The lines, without their line endings.
+    """
+    text = data.decode("utf-8", errors="replace")
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    if lines[-1] == "":
+        # A final line ending does not start another line
+        lines.pop()
+    return lines
+
+
+def _normalize_member_name(name: str) -> str:
+    """
+    Normalizes an archive member name to a relative "/"-separated path.
+
+    Drops empty, "." and ".." components, as extraction would.
+
+    Args:
+        name: The member name as stored in the archive.
+
+    Returns:
+        The relative path, or an empty string if nothing remains.
+    """
+    return "/".join(part for part in name.split("/") if part not in ("", ".", ".."))
+
+
+def _format_range_unified(start: int, stop: int) -> str:
+    """Formats a hunk range the same way as difflib.unified_diff."""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
@@ -0,0 +1,41 @@
+from importlib.metadata import version
+import threading
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+MODULE_NAME = __name__.split(".")[0]
+MODULE_VERSION = version(MODULE_NAME)
+
+_local = threading.local()
+
+
+def session() -> Session:
+    """
+    Returns the HTTP session for the calling thread.
+
+    Sessions are created once per thread and shared by every caller on that
+    thread, so connections to PyPI and its file host are reused across
+    packages instead of paying a new TLS handshake for each request.
+    Transient failures are retried with backoff.
+    """
+    if not hasattr(_local, "session"):
+        retry = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            # Hand the final response back so callers can raise_for_status
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=8, max_retries=retry)
+
+        s = Session()
+        s.mount("https://", adapter)
+        s.headers.update(
+            {
+                "User-Agent": f"{MODULE_NAME}/{MODULE_VERSION}",
+            }
+        )
+        _local.session = s
+    return _local.session
@@ -2,9 +2,14 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class DependencyChange:
-    """Represents a change in a dependency version."""
+    """
+    Represents a change in a dependency version.
+
+    Uses __slots__ rather than a per-instance __dict__, which keeps instances
+    small and attribute access cheap when iterating many changes.
+    """
 
     name: str
     old_version: Optional[str]
@@ -1,7 +1,8 @@
 import sys
 import atexit
+import functools
 import pathlib
-from typing import Optional
+from typing import Dict, Optional, TextIO
 
 from depdiff.parser import DiffParser
 from depdiff.reporter import ReportGenerator
@@ -22,15 +23,26 @@ class DependencyDiffOrchestrator:
 
         Args:
             max_workers: Maximum number of worker threads for parallel processing.
-                        If None, uses min(20, cpu_count * 2).
+                        If None, uses $DEPDIFF_WORKERS, or two per CPU bounded
+                        to [8, 32].
         """
         self.parser = DiffParser()
-        self.parallel_retriever = ParallelRetriever(max_workers=max_workers)
         self.reporter = ReportGenerator()
+        self._max_workers = max_workers
 
         # Register cleanup on exit
         atexit.register(self._cleanup)
 
+    @functools.cached_property
+    def parallel_retriever(self) -> ParallelRetriever:
+        """
+        The retriever used to fetch diffs, created on first use.
+
+        Its thread and process pools are only started when there is a version
+        update to fetch, so runs that find nothing to compare never pay for them.
+        """
+        return ParallelRetriever(max_workers=self._max_workers)
+
     def process_requirements_diff(
         self, diff_input: str, input_source: Optional[str] = None
     ) -> str:
@@ -69,6 +81,46 @@ class DependencyDiffOrchestrator:
 
         return report
 
+    def stream_requirements_diff(self, diff_input: str, out: TextIO) -> None:
+        """
+        Process a requirements.txt diff and write the report as it is produced.
+
+        Produces the same report as process_requirements_diff, but each package
+        section is written as soon as it and every package sorting before it
+        have finished, rather than after the slowest package.
+
+        Args:
+            diff_input: The unified diff content of requirements.txt changes.
+            out: Stream to write the report to.
+        """
+        updates = [c for c in self.parser.parse(diff_input) if c.is_update]
+
+        if not updates:
+            out.write("No dependency changes detected.\n")
+            return
+
+        names = sorted(c.name for c in updates)
+        finished: Dict[str, str] = {}
+        next_index = 0
+
+        def write_ready_sections(package_name: str, diff: str) -> None:
+            nonlocal next_index
+            finished[package_name] = diff
+            # Keep the report sorted by only writing the longest finished prefix
+            while next_index < len(names) and names[next_index] in finished:
+                name = names[next_index]
+                if next_index:
+                    out.write(self.reporter.SECTION_SEPARATOR)
+                self.reporter.write_section(out, name, finished.pop(name))
+                out.flush()
+                next_index += 1
+
+        print(f"Processing {len(updates)} packages in parallel...", file=sys.stderr)
+        self.parallel_retriever.process_changes_parallel(
+            updates, on_result=write_ready_sections
+        )
+        out.write("\n")
+
     def process_from_file(self, filepath: pathlib.Path) -> str:
         """
         Process a requirements.txt diff from a file.
@@ -94,7 +146,9 @@ class DependencyDiffOrchestrator:
 
     def _cleanup(self) -> None:
         """Clean up temporary directories created during processing."""
-        self.parallel_retriever.cleanup()
+        # Nothing to clean up if the retriever was never needed
+        if "parallel_retriever" in self.__dict__:
+            self.parallel_retriever.cleanup()
 
     def cleanup(self) -> None:
         """Manually trigger cleanup of temporary resources."""
@@ -1,21 +1,50 @@
+import functools
 import os
 import sys
 import pathlib
+import queue
 import threading
-from concurrent.futures import ThreadPoolExecutor, Future
-from typing import Dict, List, Optional, Set
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Self, Set, Tuple
 from depdiff.models import DependencyChange
 from depdiff.comparator import SourceComparator
-from depdiff.retriever import HybridRetriever
+from depdiff.pypi.metadata import PackageMetadata
+from depdiff.retriever import HybridRetriever, fetch_pypi_metadata
+from depdiff.singleflight import SingleFlight
 from depdiff.types import cleanup_temp_dirs
 
 
+def _default_workers() -> int:
+    """
+    Returns the default number of package workers.
+
+    Honours $DEPDIFF_WORKERS if set to a positive integer. Otherwise uses two
+    workers per CPU, bounded to [8, 32]: small CI machines still overlap
+    enough network round trips, and large machines do not start so many
+    concurrent clones that they saturate the network link.
+    """
+    override = os.environ.get("DEPDIFF_WORKERS")
+    if override:
+        try:
+            workers = int(override)
+        except ValueError:
+            workers = 0
+        if workers > 0:
+            return workers
+
+    cpu_count = os.cpu_count() or 4
+    return min(32, max(8, cpu_count * 2))
+
+
 class ParallelRetriever:
     """
     Manages parallel processing of dependency changes using ThreadPoolExecutor.
 
-    Provides thread-safe temp directory tracking and progress reporting while
-    processing multiple packages concurrently.
+    Network and git work for each package runs on a thread pool, while the
+    CPU-bound archive comparisons of the artifact fallback are handed to a
+    separate process pool. Provides thread-safe temp directory tracking and
+    progress reporting while processing multiple packages concurrently.
     """
 
     def __init__(self, max_workers: Optional[int] = None):
@@ -24,24 +53,53 @@ class ParallelRetriever:
 
         Args:
             max_workers: Maximum number of worker threads. If None, uses
-                        min(20, cpu_count * 2) for optimal I/O-bound performance.
+                        $DEPDIFF_WORKERS, or two per CPU bounded to [8, 32].
         """
         cpu_count = os.cpu_count() or 4
-        workers = max_workers or min(20, cpu_count * 2)
-        self._executor = ThreadPoolExecutor(max_workers=workers)
+        self.max_workers = max_workers or _default_workers()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # PyPI lookups are small requests, so they get their own wider pool
+        # and never queue behind clones and downloads
+        self._metadata_executor = ThreadPoolExecutor(max_workers=32)
+        # Each package downloads the old version of its artifact here while
+        # the new one downloads on its worker, so one slot per worker is
+        # enough. Threads are reused, as are their HTTP sessions.
+        self._download_executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        # Shared by every package, so identical lookups and clones requested
+        # by concurrent workers are only done once
+        self._metadata_lookups: SingleFlight[Tuple[str, str], PackageMetadata] = (
+            SingleFlight()
+        )
+        self._clone_lookups: SingleFlight[str, pathlib.Path] = SingleFlight()
+        # Processes are only started once the first comparison is submitted.
+        # "spawn" avoids forking a process that is running worker threads.
+        self._diff_executor = ProcessPoolExecutor(
+            max_workers=cpu_count, mp_context=multiprocessing.get_context("spawn")
+        )
         self._temp_dirs: Set[pathlib.Path] = set()
         self._temp_dirs_lock = threading.Lock()
-        self._progress_lock = threading.Lock()
         self._comparator = SourceComparator()
 
     def process_changes_parallel(
-        self, changes: List[DependencyChange]
+        self,
+        changes: List[DependencyChange],
+        on_result: Optional[Callable[[str, str], None]] = None,
+        on_error: Optional[Callable[[str, str], None]] = None,
     ) -> Dict[str, str]:
         """
         Process multiple dependency changes in parallel.
 
+        Results are collected in completion order, so a slow package does not
+        hold back progress reporting for the others.
+
         Args:
             changes: List of dependency changes to process.
+            on_result: Optional callback invoked with the package name and diff
+                      string as soon as each package finishes. It is called
+                      from the thread that called this method.
+            on_error: Optional callback invoked with the package name and error
+                     message when a package fails. If given, failures are
+                     reported here instead of through on_result.
 
         Returns:
             Dictionary mapping package names to their diff strings.
@@ -49,43 +107,90 @@ class ParallelRetriever:
         total = len(changes)
         completed = 0
 
-        # Submit all packages to thread pool
-        futures: Dict[str, Future[str]] = {}
+        self._prefetch_metadata(changes)
+
+        # Submit all packages to thread pool. Finished futures are handed back
+        # through a queue, because done callbacks also fire when cleanup
+        # cancels a package that has not started, which wait() never notices.
+        finished: queue.SimpleQueue[Future[str]] = queue.SimpleQueue()
+        futures: Dict[Future[str], str] = {}
         for change in changes:
             future = self._executor.submit(self._process_single_package, change)
-            futures[change.name] = future
+            futures[future] = change.name
+            future.add_done_callback(finished.put)
 
         # Collect results with error handling
         diffs: Dict[str, str] = {}
+        pending: Set[Future[str]] = set(futures)
 
-        for package_name, future in futures.items():
+        while pending:
             try:
-                # Wait for result with 5-minute timeout
-                diff = future.result(timeout=300)
-                diffs[package_name] = diff
-
-                # Update progress
+                done = [finished.get(timeout=300)]
+                timed_out = False
+            except queue.Empty:
+                # Give up on whatever is left if nothing finishes in 5 minutes
+                for future in pending:
+                    future.cancel()
+                done, timed_out = list(pending), True
+            pending.difference_update(done)
+
+            for future in done:
+                package_name = futures[future]
                 completed += 1
-                with self._progress_lock:
+                # Only this collecting thread writes progress, so workers never
+                # wait on stderr
+                try:
+                    if timed_out:
+                        raise TimeoutError("timed out after 300 seconds")
+                    if future.cancelled():
+                        # The pool was shut down before this package started
+                        raise RuntimeError("cancelled before it started")
+                    diff = future.result()
                     print(
                         f"[{completed}/{total}] Completed {package_name}",
                         file=sys.stderr,
                     )
-
-            except Exception as e:
-                # Log error but continue with other packages
-                completed += 1
-                error_msg = f"Error: {e}"
-                diffs[package_name] = error_msg
-
-                with self._progress_lock:
+                except Exception as e:
+                    # Log error but continue with other packages
+                    diffs[package_name] = f"Error: {e}"
                     print(
                         f"[{completed}/{total}] Failed {package_name}: {e}",
                         file=sys.stderr,
                     )
+                    if on_error is not None:
+                        on_error(package_name, str(e))
+                    elif on_result is not None:
+                        on_result(package_name, diffs[package_name])
+                    continue
+
+                diffs[package_name] = diff
+                if on_result is not None:
+                    on_result(package_name, diff)
 
         return diffs
 
+    def _prefetch_metadata(self, changes: List[DependencyChange]) -> None:
+        """
+        Start PyPI metadata lookups for every version that will be needed.
+
+        Workers wait only on the lookups for their own package, so all the
+        metadata round trips overlap instead of each one running in front of
+        its package's clone or download.
+
+        Args:
+            changes: List of dependency changes about to be processed.
+        """
+        for change in changes:
+            if not change.is_update:
+                continue
+            for version in (change.old_version, change.new_version):
+                assert version is not None
+                self._metadata_executor.submit(
+                    self._metadata_lookups.do,
+                    (change.name, version),
+                    functools.partial(fetch_pypi_metadata, change.name, version),
+                )
+
     def _process_single_package(self, change: DependencyChange) -> str:
         """
         Process a single package (executed in thread pool).
@@ -97,7 +202,14 @@ class ParallelRetriever:
             The unified diff string for this package.
         """
         # Create HybridRetriever for this thread
-        retriever = HybridRetriever(comparator=self._comparator, temp_dir_tracker=self)
+        retriever = HybridRetriever(
+            comparator=self._comparator,
+            temp_dir_tracker=self,
+            diff_executor=self._diff_executor,
+            download_executor=self._download_executor,
+            metadata_lookups=self._metadata_lookups,
+            clone_lookups=self._clone_lookups,
+        )
         return retriever.get_diff(change)
 
     def track_temp_dir(self, path: pathlib.Path) -> None:
@@ -110,12 +222,30 @@ class ParallelRetriever:
         with self._temp_dirs_lock:
             self._temp_dirs.add(path)
 
-    def cleanup(self) -> None:
+    def cleanup(self, wait: bool = True) -> None:
         """
-        Clean up all tracked temp directories and shutdown thread pool.
+        Clean up all tracked temp directories and shutdown worker pools.
 
         This should be called when the retriever is no longer needed.
+
+        Args:
+            wait: Wait for packages that are already running to finish. If
+                  False, they are left to finish on their own, and any temp
+                  directories they create afterwards are not removed.
         """
-        self._executor.shutdown(wait=True)
-        cleanup_temp_dirs(self._temp_dirs)
-        self._temp_dirs.clear()
+        # Packages that have not started yet are dropped rather than run
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._metadata_executor.shutdown(wait=wait)
+        self._download_executor.shutdown(wait=wait)
+        self._diff_executor.shutdown(wait=wait)
+        # Running packages may still register directories while these are
+        # being removed
+        with self._temp_dirs_lock:
+            temp_dirs, self._temp_dirs = self._temp_dirs, set()
+        cleanup_temp_dirs(temp_dirs)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.cleanup()
@@ -1,17 +1,48 @@
-from typing import List
+import re
+from functools import lru_cache
+from typing import List, Optional
 
 from packaging.requirements import InvalidRequirement, Requirement
 
 from depdiff.models import DependencyChange
 
+# Matches added/removed lines in a unified diff, skipping the `+++`/`---`
+# file headers and lines with no content after the sign
+_LINE_RE = re.compile(r"(?m)^([+\-])(?!\1)[ \t]*(\S.*)$")
 
-class DiffParser:
-    """Parses unified diff input to identify dependency changes."""
+# Fast path for the common `name==version` pin, optionally followed by an
+# environment marker or comment. Anything else goes through `Requirement`.
+_REQ_FAST = re.compile(
+    r"([A-Za-z0-9][A-Za-z0-9_.\-]*)\s*==\s*([A-Za-z0-9][A-Za-z0-9_.+!\-]*)\s*(?:[;#].*)?"
+)
+
+
+@lru_cache(maxsize=4096)
+def _parse_spec(payload: str) -> Optional[tuple[str, str]]:
+    """
+    Extracts the package name and pinned version from a requirement line.
 
-    _dependency_changes: dict[str, DependencyChange]
+    Results are memoized, since the same pins recur across the removed and
+    added sides of a diff and across repeated parses in one process.
 
-    def __init__(self):
-        self._dependency_changes = {}
+    Args:
+        payload: The requirement text with the diff sign stripped.
+
+    Returns:
+        A (name, version) tuple, or None if the line is not a valid requirement.
+    """
+    if fast := _REQ_FAST.fullmatch(payload):
+        return fast.group(1), fast.group(2)
+
+    try:
+        req = Requirement(payload)
+        return req.name, list(req.specifier)[0].version
+    except (InvalidRequirement, IndexError):
+        return None
+
+
+class DiffParser:
+    """Parses unified diff input to identify dependency changes."""
 
     def parse(self, diff_content: str) -> List[DependencyChange]:
         """
@@ -23,37 +54,24 @@ class DiffParser:
         Returns:
             A list of DependencyChange objects representing version bumps, additions, or removals.
         """
-        for line in diff_content.splitlines():
-            if line.startswith("+") and line[1] != "+":
-                try:
-                    req = Requirement(line[1:].strip())
-                    version = list(req.specifier)[0].version
-
-                    if req.name in self._dependency_changes:
-                        self._dependency_changes[req.name].new_version = version
-                    else:
-                        self._dependency_changes[req.name] = DependencyChange(
-                            req.name, old_version=None, new_version=version
-                        )
-                except (InvalidRequirement, IndexError):
-                    # Skip invalid requirement lines
-                    continue
-
-            elif line.startswith("-") and line[1] != "-":
-                try:
-                    req = Requirement(line[1:].strip())
-                    version = list(req.specifier)[0].version
-
-                    if req.name in self._dependency_changes:
-                        self._dependency_changes[req.name].old_version = version
-                    else:
-                        self._dependency_changes[req.name] = DependencyChange(
-                            req.name, old_version=version, new_version=None
-                        )
-                except (InvalidRequirement, IndexError):
-                    # Skip invalid requirement lines
-                    continue
-            else:
+        changes: dict[str, DependencyChange] = {}
+
+        for match in _LINE_RE.finditer(diff_content):
+            is_addition = match.group(1) == "+"
+            spec = _parse_spec(match.group(2).strip())
+            if spec is None:
+                # Skip invalid requirement lines
                 continue
+            name, version = spec
+
+            change = changes.get(name)
+            if change is None:
+                change = DependencyChange(name, old_version=None, new_version=None)
+                changes[name] = change
+
+            if is_addition:
+                change.new_version = version
+            else:
+                change.old_version = version
 
-        return list(self._dependency_changes.values())
+        return list(changes.values())
@@ -1,12 +1,13 @@
 from dataclasses import dataclass
-from importlib.metadata import version
-from typing import Self
-import threading
+from typing import Optional, Self
+import json
+import os
+import pathlib
+import tempfile
 
 from requests import Session
 
-MODULE_NAME = __name__.split(".")[0]
-MODULE_VERSION = version(MODULE_NAME)
+from depdiff import http
 
 
 @dataclass
@@ -52,22 +53,56 @@ class PackageMetadata:
 
 
 class MetadataClient:
-    def __init__(self):
-        self._local = threading.local()
+    def __init__(self, cache_dir: Optional[pathlib.Path] = None):
+        """
+        Args:
+            cache_dir: Directory to cache release metadata in. Metadata for a
+                released version does not change, so cached entries never
+                expire. If None, every lookup goes to PyPI.
+        """
+        self._cache_dir = cache_dir
 
     @property
     def _session(self) -> Session:
-        """Get thread-local session."""
-        if not hasattr(self._local, "session"):
-            self._local.session = Session()
-            self._local.session.headers.update(
-                {
-                    "User-Agent": f"{MODULE_NAME}/{MODULE_VERSION}",
-                }
-            )
-        return self._local.session
+        """Get the shared session for the calling thread."""
+        return http.session()
 
     def get(self, package: str, version: str) -> PackageMetadata:
-        r = self._session.get(f"https://pypi.org/pypi/{package}/{version}/json")
-        r.raise_for_status()
-        return PackageMetadata.from_request(r.json())
+        payload = self._read_cache(package, version)
+        if payload is None:
+            r = self._session.get(f"https://pypi.org/pypi/{package}/{version}/json")
+            r.raise_for_status()
+            payload = r.json()
+            self._write_cache(package, version, payload)
+        return PackageMetadata.from_request(payload)
+
+    def _cache_file(self, package: str, version: str) -> Optional[pathlib.Path]:
+        if self._cache_dir is None:
+            return None
+        return self._cache_dir / package.lower() / f"{version}.json"
+
+    def _read_cache(self, package: str, version: str) -> Optional[dict]:
+        cache_file = self._cache_file(package, version)
+        if cache_file is None:
+            return None
+        try:
+            return json.loads(cache_file.read_text())
+        except (OSError, ValueError):
+            # Missing or corrupt entries are treated as a cache miss
+            return None
+
+    def _write_cache(self, package: str, version: str, payload: dict) -> None:
+        cache_file = self._cache_file(package, version)
+        if cache_file is None:
+            return
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file and rename so concurrent readers never see
+            # a partially written entry
+            fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(payload, f)
+            os.replace(tmp_name, cache_file)
+        except OSError:
+            # Caching is best effort
+            pass
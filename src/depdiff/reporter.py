@@ -1,9 +1,17 @@
-from typing import Dict
+import io
+from typing import Dict, TextIO
+
+# Width of the package header lines
+_HEADER_WIDTH = 80
+_SEPARATOR = "=" * _HEADER_WIDTH
 
 
 class ReportGenerator:
     """Generates the final report from the aggregated diffs."""
 
+    # Separates the sections of consecutive packages with a blank line
+    SECTION_SEPARATOR = "\n\n"
+
     def generate_report(self, diffs: Dict[str, str]) -> str:
         """
         Formats the collected diffs into a human-readable report.
@@ -14,29 +22,48 @@ class ReportGenerator:
         Returns:
             The formatted report string.
         """
-        if not diffs:
-            return ""
-
-        report_sections: list[str] = []
-
-        for package_name in sorted(diffs.keys()):
-            diff_content = diffs[package_name]
+        buf = io.StringIO()
+        for index, package_name in enumerate(sorted(diffs)):
+            if index:
+                buf.write(self.SECTION_SEPARATOR)
+            self.write_section(buf, package_name, diffs[package_name])
+        return buf.getvalue()
+
+    def format_section(self, package_name: str, diff_content: str) -> str:
+        """
+        Formats the report section for a single package.
 
-            # Add header for this package
-            header = self._format_header(package_name)
-            report_sections.append(header)
+        Args:
+            package_name: The name of the package.
+            diff_content: The diff string for the package.
 
-            # Add the diff content (strip trailing newlines to avoid double spacing)
-            report_sections.append(diff_content.rstrip("\n"))
+        Returns:
+            The header followed by the diff, without a trailing newline.
+        """
+        buf = io.StringIO()
+        self.write_section(buf, package_name, diff_content)
+        return buf.getvalue()
 
-            # Add blank line between packages
-            report_sections.append("")
+    def write_section(self, out: TextIO, package_name: str, diff_content: str) -> None:
+        """
+        Writes the report section for a single package to a stream.
 
-        # Remove the trailing blank line at the end
-        if report_sections and report_sections[-1] == "":
-            report_sections.pop()
+        The diff is written directly rather than copied into a combined
+        string, which matters for packages with very large diffs.
 
-        return "\n".join(report_sections)
+        Args:
+            out: Stream to write the section to.
+            package_name: The name of the package.
+            diff_content: The diff string for the package.
+        """
+        out.write(self._format_header(package_name))
+        out.write("\n")
+        # Leave off trailing newlines from the diff to avoid double spacing,
+        # only copying the diff when there are any
+        end = len(diff_content)
+        while end and diff_content[end - 1] == "\n":
+            end -= 1
+        out.write(diff_content if end == len(diff_content) else diff_content[:end])
 
     def _format_header(self, package_name: str) -> str:
         """
@@ -48,10 +75,6 @@ class ReportGenerator:
         Returns:
             A formatted header string.
         """
-        separator = "=" * 80
         title = f" DIFF FOR PACKAGE: {package_name.upper()} "
         # Center the title in the separator
-        padding = (80 - len(title)) // 2
-        header_line = "=" * padding + title + "=" * (80 - padding - len(title))
-
-        return f"{separator}\n{header_line}\n{separator}"
+        return f"{_SEPARATOR}\n{title.center(_HEADER_WIDTH, '=')}\n{_SEPARATOR}"
@@ -1,16 +1,184 @@
-from typing import Optional, Set
+from typing import Dict, Generator, List, Optional, Self, Sequence, Set, Tuple
+import contextlib
+import hashlib
 import pathlib
+import re
+import shutil
 import subprocess
 import tempfile
-import tarfile
-import zipfile
-import requests
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import urllib.parse
+from concurrent.futures import Executor, ThreadPoolExecutor
+from depdiff import http
 from depdiff.models import DependencyChange
+from depdiff.cache import cache_dir
 from depdiff.comparator import SourceComparator
 from depdiff.pypi.metadata import MetadataClient, PackageMetadata
+from depdiff.singleflight import SingleFlight
 from depdiff.types import TempDirTracker, cleanup_temp_dirs
 
+# Git hosting platforms whose project URLs can be cloned directly
+_GIT_HOST_RE = re.compile(r"https://(?:github\.com|gitlab\.com|bitbucket\.org)/")
+
+# Serialises git fetches into each cached repository
+_REPO_LOCKS: Dict[pathlib.Path, threading.Lock] = {}
+_REPO_LOCKS_GUARD = threading.Lock()
+
+# Size of the chunks written to disk while downloading artifacts
+_DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# Files with these suffixes are reported as changed in git diffs without
+# fetching or diffing their contents
+_BINARY_SUFFIXES = frozenset(
+    {
+        # Images and fonts
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".ico",
+        ".bmp",
+        ".webp",
+        ".woff",
+        ".woff2",
+        ".ttf",
+        ".otf",
+        ".eot",
+        # Archives
+        ".zip",
+        ".gz",
+        ".tgz",
+        ".bz2",
+        ".xz",
+        ".whl",
+        ".jar",
+        # Compiled artifacts
+        ".so",
+        ".dll",
+        ".dylib",
+        ".pyd",
+        ".pyc",
+        ".exe",
+        ".o",
+        ".a",
+    }
+)
+
+
+def fetch_pypi_metadata(package_name: str, version: str) -> PackageMetadata:
+    """
+    Fetches package metadata from PyPI, using the on-disk cache if possible.
+
+    Args:
+        package_name: Name of the package.
+        version: Version string.
+
+    Returns:
+        The metadata for that release.
+    """
+    client = MetadataClient(cache_dir=cache_dir() / "pypi")
+    return client.get(package_name, version)
+
+
+def _canonical_git_url(git_url: str) -> str:
+    """
+    Normalises a Git URL so different spellings of a repository compare equal.
+
+    The host is lower-cased and stripped of "www.", and any trailing slash or
+    ".git" suffix is removed from the path.
+
+    Args:
+        git_url: The URL of the Git repository.
+
+    Returns:
+        The canonical form of the URL.
+    """
+    parts = urllib.parse.urlsplit(git_url)
+    host = parts.netloc.lower().removeprefix("www.")
+    path = parts.path.rstrip("/").removesuffix(".git")
+    return urllib.parse.urlunsplit((parts.scheme.lower(), host, path, "", ""))
+
+
+def _tag_candidates(version: str) -> Tuple[str, str, str]:
+    """
+    Returns the tag names a version may be released under, in preference order.
+
+    Args:
+        version: Version string (e.g., "1.0.0").
+
+    Returns:
+        The exact version, "v"-prefixed and "release-"-prefixed tag names.
+    """
+    return version, f"v{version}", f"release-{version}"
+
+
+@contextlib.contextmanager
+def _repo_lock(repo_path: pathlib.Path) -> Generator[None, None, None]:
+    """
+    Holds the in-process lock for a cached repository.
+
+    Args:
+        repo_path: Path to the cached repository.
+    """
+    with _REPO_LOCKS_GUARD:
+        lock = _REPO_LOCKS.setdefault(repo_path, threading.Lock())
+    with lock:
+        yield
+
+
+def _remote_config(git_url: str) -> str:
+    """
+    Returns a git config section for a tags-only "origin" remote.
+
+    Args:
+        git_url: The URL of the remote repository.
+
+    Returns:
+        The section text, ready to append to a repository's config file.
+    """
+    # Values are quoted, so only backslashes and double quotes need escaping
+    quoted = git_url.replace("\\", "\\\\").replace('"', '\\"')
+    return (
+        f'[remote "origin"]\n\turl = "{quoted}"\n\tfetch = +refs/tags/*:refs/tags/*\n'
+    )
+
+
+def _binary_stub(meta: str, path: str) -> str:
+    """
+    Formats the diff git shows for a binary file, without reading its blobs.
+
+    Args:
+        meta: The ":<old mode> <new mode> <old sha> <new sha> <status>" field
+              of a `git diff --raw` entry.
+        path: The changed path.
+
+    Returns:
+        The "diff --git" header, mode and index lines, and "Binary files"
+        line for the path.
+    """
+    old_mode, new_mode, old_sha, new_sha, status = meta.lstrip(":").split()
+    lines = [f"diff --git a/{path} b/{path}\n"]
+    old_name, new_name = f"a/{path}", f"b/{path}"
+    if status == "A":
+        lines.append(f"new file mode {new_mode}\n")
+        lines.append(f"index {old_sha}..{new_sha}\n")
+        old_name = "/dev/null"
+    elif status == "D":
+        lines.append(f"deleted file mode {old_mode}\n")
+        lines.append(f"index {old_sha}..{new_sha}\n")
+        new_name = "/dev/null"
+    elif old_mode != new_mode:
+        lines.append(f"old mode {old_mode}\n")
+        lines.append(f"new mode {new_mode}\n")
+        if old_sha == new_sha:
+            # Only the mode changed, so git has no contents to report
+            return "".join(lines)
+        lines.append(f"index {old_sha}..{new_sha}\n")
+    else:
+        lines.append(f"index {old_sha}..{new_sha} {new_mode}\n")
+    lines.append(f"Binary files {old_name} and {new_name} differ\n")
+    return "".join(lines)
+
 
 class HybridRetriever:
     """
@@ -23,10 +191,44 @@ class HybridRetriever:
         comparator: SourceComparator,
         temp_dir_tracker: Optional[TempDirTracker] = None,
         parallel_downloads: bool = True,
+        diff_executor: Optional[Executor] = None,
+        download_executor: Optional[Executor] = None,
+        metadata_lookups: Optional[
+            SingleFlight[Tuple[str, str], PackageMetadata]
+        ] = None,
+        clone_lookups: Optional[SingleFlight[str, pathlib.Path]] = None,
     ):
+        """
+        Args:
+            comparator: Comparator used by the artifact fallback.
+            temp_dir_tracker: Optional tracker to register temp dirs with.
+                        If None, the retriever tracks and cleans them itself.
+            parallel_downloads: Download both artifact versions concurrently.
+            diff_executor: Optional executor to run archive comparisons on.
+                        Comparison is CPU-bound, so passing a process pool keeps
+                        it from holding the GIL while other packages download.
+                        If None, comparisons run on the calling thread.
+            download_executor: Optional executor to download the old artifact
+                        on while the new one downloads on the calling thread.
+                        Its threads should be long-lived so they keep their
+                        HTTP sessions between packages. If None, the retriever
+                        starts a single download thread of its own.
+            metadata_lookups: Optional PyPI lookups shared by retrievers in
+                        the same run, keyed by (package name, version), so each
+                        lookup is made once even when requested concurrently.
+            clone_lookups: Optional clones shared by retrievers in the same
+                        run, keyed by canonical Git URL. Each repository is
+                        cloned or refreshed once per run. If None, cached
+                        clones are refreshed on every use.
+        """
         self.comparator = comparator
         self._temp_dir_tracker = temp_dir_tracker
         self._parallel_downloads = parallel_downloads
+        self._diff_executor = diff_executor
+        self._download_executor = download_executor
+        self._owned_download_executor: Optional[ThreadPoolExecutor] = None
+        self._metadata_lookups = metadata_lookups
+        self._clone_lookups = clone_lookups
         self._temp_dirs: Set[pathlib.Path] = set()
 
     def _track_temp_dir(self, path: pathlib.Path) -> None:
@@ -69,8 +271,8 @@ class HybridRetriever:
         Attempts to fetch the diff using Git.
 
         1. Fetch PyPI metadata to find Git URL.
-        2. Clone repo.
-        3. Resolve tags.
+        2. Prepare the cached repo.
+        3. Resolve tags, fetching them if needed.
         4. Run git diff.
 
         Returns:
@@ -93,16 +295,14 @@ class HybridRetriever:
             if not git_url:
                 return None
 
-            # Clone the repository
+            # Prepare the cached repository
             repo_path = self._clone_repo(git_url)
 
-            # Resolve tags for both versions
-            old_tag = self._resolve_tag(repo_path, change.old_version)
-            if not old_tag:
-                return None
-
-            new_tag = self._resolve_tag(repo_path, change.new_version)
-            if not new_tag:
+            # Resolve tags for both versions, fetching them if needed
+            old_tag, new_tag = self._fetch_tags(
+                repo_path, [change.old_version, change.new_version]
+            )
+            if not old_tag or not new_tag:
                 return None
 
             # Generate and return the diff
@@ -114,9 +314,13 @@ class HybridRetriever:
             return None
 
     def _fetch_pypi_metadata(self, package_name: str, version: str) -> PackageMetadata:
-        """Fetches package metadata from PyPI."""
-        client = MetadataClient()
-        return client.get(package_name, version)
+        """Fetches package metadata from PyPI, using the on-disk cache if possible."""
+        if self._metadata_lookups is None:
+            return fetch_pypi_metadata(package_name, version)
+        return self._metadata_lookups.do(
+            (package_name, version),
+            lambda: fetch_pypi_metadata(package_name, version),
+        )
 
     def _extract_git_url(self, metadata: PackageMetadata) -> Optional[str]:
         """
@@ -136,60 +340,166 @@ class HybridRetriever:
             return None
 
         # Check if the URL is from a known Git hosting platform
-        git_platforms = [
-            "https://github.com/",
-            "https://gitlab.com/",
-            "https://bitbucket.org/",
-        ]
-
-        for platform in git_platforms:
-            if url.startswith(platform):
-                # Ensure it ends with .git for consistency
-                if not url.endswith(".git"):
-                    url = url.rstrip("/") + ".git"
-                return url
+        if not _GIT_HOST_RE.match(url):
+            return None
 
-        return None
+        # Ensure it ends with .git for consistency
+        if not url.endswith(".git"):
+            url = url.rstrip("/") + ".git"
+        return url
 
     def _clone_repo(self, git_url: str) -> pathlib.Path:
         """
-        Clones a git repository to a temporary location.
+        Prepares a git repository in the persistent clone cache.
 
-        Uses --filter=blob:none for performance (blobless clone).
+        Repositories are bare and keyed by a hash of the canonical URL, so
+        spellings of the same repository share one. Nothing is fetched here:
+        `_fetch_tags` later fetches just the tags a diff needs.
 
         Args:
             git_url: The URL of the Git repository to clone.
 
         Returns:
-            Path to the cloned repository.
+            Path to the cached bare repository.
 
         Raises:
-            subprocess.CalledProcessError: If git clone fails.
+            subprocess.CalledProcessError: If git init fails.
         """
-        # Create a temporary directory for the clone
-        temp_dir = tempfile.mkdtemp(prefix="depdiff_git_")
-        repo_path = pathlib.Path(temp_dir)
+        canonical_url = _canonical_git_url(git_url)
+        if self._clone_lookups is None:
+            return self._init_repo(git_url, canonical_url)
+        return self._clone_lookups.do(
+            canonical_url, lambda: self._init_repo(git_url, canonical_url)
+        )
 
-        # Track for cleanup
-        self._track_temp_dir(repo_path)
+    def _init_repo(self, git_url: str, canonical_url: str) -> pathlib.Path:
+        """
+        Creates a cached bare repository with origin set up, if not present.
 
-        # Clone with blob filtering for performance
-        # --filter=blob:none fetches commits and trees but not blobs initially
-        subprocess.run(
-            ["git", "clone", "--filter=blob:none", git_url, str(repo_path)],
-            check=True,
-            capture_output=True,
-            text=True,
+        Args:
+            git_url: The URL of the Git repository to clone.
+            canonical_url: The canonical form of git_url, used as the cache key.
+
+        Returns:
+            Path to the cached bare repository.
+
+        Raises:
+            subprocess.CalledProcessError: If git init fails.
+        """
+        clones_dir = cache_dir() / "clones"
+        repo_path = clones_dir / hashlib.sha256(canonical_url.encode()).hexdigest()
+
+        if (repo_path / "HEAD").exists():
+            return repo_path
+
+        # Initialise next to the final location and rename into place, so
+        # other workers never see a half set up repository in the cache
+        clones_dir.mkdir(parents=True, exist_ok=True)
+        temp_path = pathlib.Path(
+            tempfile.mkdtemp(prefix="depdiff_git_", dir=clones_dir)
         )
+        try:
+            subprocess.run(
+                ["git", "init", "--bare", "--quiet"],
+                cwd=temp_path,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            # Set up the remote by hand rather than with `git remote add`.
+            # Writing the section directly saves a `git config` process per key.
+            with open(temp_path / "config", "a") as f:
+                f.write(_remote_config(git_url))
+            try:
+                temp_path.rename(repo_path)
+            except OSError:
+                # Another worker cached the same repository first
+                if not (repo_path / "HEAD").exists():
+                    raise
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
 
         return repo_path
 
+    def _fetch_tags(
+        self, repo_path: pathlib.Path, versions: Sequence[str]
+    ) -> List[Optional[str]]:
+        """
+        Resolves versions to tags, fetching any that are missing from origin.
+
+        The candidate tag names for missing versions are looked up on origin
+        with one `git ls-remote`. Those it has are fetched with --depth=1 and
+        --filter=blob:none, which transfers only the tagged commits and their
+        trees; `git diff` needs nothing else, and fetches the blobs it reads
+        on demand. Tags already in the cached repository are used without
+        contacting origin.
+
+        Args:
+            repo_path: Path to the cached bare repository.
+            versions: Version strings to resolve.
+
+        Returns:
+            The resolved tag name for each version, or None where none matched.
+        """
+        tags = self._resolve_tags(repo_path, versions)
+        missing = [version for version, tag in zip(versions, tags) if tag is None]
+        if not missing:
+            return tags
+
+        # Naming a tag that does not exist fails the whole fetch, so first
+        # ask origin which of the candidate tags it has, then fetch exactly
+        # those rather than everything a glob would match
+        candidates = [
+            f"refs/tags/{candidate}"
+            for version in missing
+            for candidate in _tag_candidates(version)
+        ]
+        try:
+            listing = subprocess.run(
+                ["git", "ls-remote", "--tags", "origin", *candidates],
+                cwd=repo_path,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            # Each line is "<sha>\t<ref>". Patterns match the tail of a ref,
+            # so anything but an exact name, including the peeled "^{}" line
+            # of an annotated tag, is dropped.
+            listed = {line.partition("\t")[2] for line in listing.stdout.splitlines()}
+            found = [ref for ref in candidates if ref in listed]
+            if not found:
+                return tags
+
+            # Fetches into the same repository would contend for its
+            # shallow.lock, so run them one at a time
+            with _repo_lock(repo_path):
+                subprocess.run(
+                    [
+                        "git",
+                        "fetch",
+                        "--depth=1",
+                        "--filter=blob:none",
+                        "--no-tags",
+                        "--quiet",
+                        "origin",
+                        *(f"+{ref}:{ref}" for ref in found),
+                    ],
+                    cwd=repo_path,
+                    check=True,
+                    capture_output=True,
+                    text=True,
+                )
+        except subprocess.CalledProcessError:
+            # Unreachable remotes leave the tags unresolved, which falls back
+            # to the artifact strategy
+            return tags
+
+        return self._resolve_tags(repo_path, versions)
+
     def _resolve_tag(self, repo_path: pathlib.Path, version: str) -> Optional[str]:
         """
         Resolves a version string to a Git tag.
 
-        Tries exact match first (e.g., "1.0.0"), then with "v" prefix ("v1.0.0").
-
         Args:
             repo_path: Path to the Git repository.
             version: Version string to resolve (e.g., "1.0.0").
@@ -197,35 +507,61 @@ class HybridRetriever:
         Returns:
             The resolved tag name if found, None otherwise.
         """
-        # Get all tags from the repository
+        return self._resolve_tags(repo_path, [version])[0]
+
+    def _resolve_tags(
+        self, repo_path: pathlib.Path, versions: Sequence[str]
+    ) -> List[Optional[str]]:
+        """
+        Resolves several version strings to Git tags with one git invocation.
+
+        For each version, tries exact match first (e.g., "1.0.0"), then with
+        "v" prefix ("v1.0.0"), then with "release-" prefix ("release-1.0.0").
+        Only the candidate refs are looked up, so the cost does not grow with
+        the number of tags in the repository.
+
+        Args:
+            repo_path: Path to the Git repository.
+            versions: Version strings to resolve.
+
+        Returns:
+            The resolved tag name for each version, or None where none matched.
+        """
+        candidates = [_tag_candidates(version) for version in versions]
+
         try:
             result = subprocess.run(
-                ["git", "tag", "--list"],
+                [
+                    "git",
+                    "for-each-ref",
+                    "--format=%(refname:strip=2)",
+                    *(f"refs/tags/{tag}" for tags in candidates for tag in tags),
+                ],
                 cwd=repo_path,
                 check=True,
                 capture_output=True,
                 text=True,
             )
-            tags = set(result.stdout.strip().split("\n"))
-
-            # Try exact match first
-            if version in tags:
-                return version
-
-            # Try with "v" prefix
-            v_version = f"v{version}"
-            if v_version in tags:
-                return v_version
-
-            return None
-
         except subprocess.CalledProcessError:
-            return None
+            return [None] * len(versions)
+
+        # Patterns also match refs nested under a candidate, so keep exact
+        # names only
+        existing = set(result.stdout.splitlines())
+        return [
+            next((tag for tag in tags if tag in existing), None) for tags in candidates
+        ]
 
     def _git_diff(self, repo_path: pathlib.Path, old_tag: str, new_tag: str) -> str:
         """
         Runs git diff between two tags.
 
+        The changed paths are listed first with `git diff --raw`, which only
+        needs trees. Files with a known binary suffix are then excluded from
+        the text diff so their blobs are never fetched into the blobless
+        clone, and are reported in their place with the header and "Binary
+        files ... differ" line git itself would show.
+
         Args:
             repo_path: Path to the Git repository.
             old_tag: The old tag/commit reference.
@@ -237,22 +573,72 @@ class HybridRetriever:
         Raises:
             subprocess.CalledProcessError: If git diff fails.
         """
-        result = subprocess.run(
-            ["git", "diff", old_tag, new_tag],
+        # Both passes skip rename detection, so they agree on every path
+        raw = subprocess.run(
+            ["git", "diff", "--raw", "-z", "--no-renames", old_tag, new_tag],
             cwd=repo_path,
             check=True,
             capture_output=True,
             text=True,
         )
-        return result.stdout
+
+        # With -z each entry is ":<modes> <shas> <status>\0<path>\0"
+        fields = raw.stdout.split("\0")
+        changes = list(zip(fields[::2], fields[1::2]))
+        is_binary = [
+            pathlib.PurePosixPath(path).suffix.lower() in _BINARY_SUFFIXES
+            for _, path in changes
+        ]
+
+        if all(is_binary):
+            # Nothing left to diff as text
+            text_diff = ""
+        else:
+            command = ["git", "diff", "--no-renames", old_tag, new_tag]
+            if any(is_binary):
+                command += ["--", "."]
+                command += [
+                    f":(top,exclude,literal){path}"
+                    for (_, path), binary in zip(changes, is_binary)
+                    if binary
+                ]
+            result = subprocess.run(
+                command,
+                cwd=repo_path,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+            text_diff = result.stdout
+
+        if not any(is_binary):
+            return text_diff
+
+        # The text diff has one section per remaining path, in the same order
+        # as the raw listing, so the binary stubs can be slotted back between
+        sections = re.split(r"(?m)^(?=diff --git )", text_diff)[1:]
+        stubs = [
+            _binary_stub(meta, path)
+            for (meta, path), binary in zip(changes, is_binary)
+            if binary
+        ]
+        if len(sections) + len(stubs) != len(changes):
+            # Not one section per path, so keep git's output intact
+            return text_diff + "".join(stubs)
+
+        text_sections = iter(sections)
+        binary_stubs = iter(stubs)
+        return "".join(
+            next(binary_stubs) if binary else next(text_sections)
+            for binary in is_binary
+        )
 
     def _artifact_fallback(self, change: DependencyChange) -> str:
         """
         Fallback strategy: downloads artifacts and compares them.
 
         1. Download .tar.gz or .whl for both versions (in parallel).
-        2. Extract.
-        3. Compare directories using SourceComparator.
+        2. Compare the archive contents using SourceComparator.
 
         Args:
             change: The dependency change object.
@@ -273,44 +659,59 @@ class HybridRetriever:
 
         # Download old and new versions
         if self._parallel_downloads:
-            # Download concurrently for better performance
-            with ThreadPoolExecutor(max_workers=2) as download_pool:
-                old_future = download_pool.submit(
-                    self._download_artifact, change.name, change.old_version
-                )
-                new_future = download_pool.submit(
-                    self._download_artifact, change.name, change.new_version
-                )
+            # Download concurrently for better performance. The new version is
+            # fetched on this thread, so only one extra thread is needed.
+            old_future = self._get_download_executor().submit(
+                self._download_artifact, change.name, change.old_version
+            )
+            new_archive = self._download_artifact(change.name, change.new_version)
 
-                # Wait for both downloads
-                old_dir = old_future.result()
-                new_dir = new_future.result()
+            # Wait for the other download
+            old_archive = old_future.result()
         else:
             # Sequential downloads (for VCR compatibility)
-            old_dir = self._download_artifact(change.name, change.old_version)
-            new_dir = self._download_artifact(change.name, change.new_version)
+            old_archive = self._download_artifact(change.name, change.old_version)
+            new_archive = self._download_artifact(change.name, change.new_version)
+
+        # Compare the archives
+        if self._diff_executor is not None:
+            return self._diff_executor.submit(
+                self.comparator.compare_archives, old_archive, new_archive
+            ).result()
+
+        return self.comparator.compare_archives(old_archive, new_archive)
 
-        # Compare the directories
-        diff = self.comparator.compare_directories(old_dir, new_dir)
+    def _get_download_executor(self) -> Executor:
+        """
+        Returns the executor the old artifact is downloaded on.
 
-        return diff
+        Returns:
+            The executor given at construction, or one owned by this retriever.
+        """
+        if self._download_executor is not None:
+            return self._download_executor
+        # Kept for the retriever's lifetime, so its thread reuses one session
+        if self._owned_download_executor is None:
+            self._owned_download_executor = ThreadPoolExecutor(max_workers=1)
+        return self._owned_download_executor
 
     def _download_artifact(self, package_name: str, version: str) -> pathlib.Path:
         """
-        Downloads and extracts the package artifact to a temporary directory.
+        Downloads the package artifact to a temporary directory.
 
-        Prefers sdist (.tar.gz) over wheels (.whl).
+        Prefers sdist (.tar.gz) over wheels (.whl). The archive is not
+        extracted; SourceComparator.compare_archives reads it directly.
 
         Args:
             package_name: Name of the package.
             version: Version string.
 
         Returns:
-            Path to the extracted package directory.
+            Path to the downloaded archive.
 
         Raises:
             ValueError: If no suitable artifact is found.
-            Exception: If download or extraction fails.
+            Exception: If the download fails.
         """
         # Fetch metadata to get download URLs
         metadata = self._fetch_pypi_metadata(package_name, version)
@@ -332,43 +733,24 @@ class HybridRetriever:
         if not download_url:
             raise ValueError(f"No suitable artifact found for {package_name} {version}")
 
-        # Create temporary directory for extraction
+        # Create temporary directory for the download
         temp_dir = tempfile.mkdtemp(prefix="depdiff_artifact_")
-        extract_path = pathlib.Path(temp_dir)
+        download_path = pathlib.Path(temp_dir)
 
         # Track for cleanup
-        self._track_temp_dir(extract_path)
-
-        # Download the artifact
-        response = requests.get(download_url, timeout=30)
-        response.raise_for_status()
-
-        # Save to temporary file
-        artifact_file = extract_path / "artifact"
-        artifact_file.write_bytes(response.content)
-
-        # Extract based on file type
-        if download_url.endswith(".tar.gz"):
-            with tarfile.open(artifact_file, "r:gz") as tar:
-                tar.extractall(path=extract_path, filter="fully_trusted")
-        elif download_url.endswith(".whl"):
-            with zipfile.ZipFile(artifact_file, "r") as zip_ref:
-                zip_ref.extractall(extract_path)
-
-        # Remove the downloaded artifact file
-        artifact_file.unlink()
-
-        # Find the extracted package directory
-        # For sdist, it's typically <package>-<version>/
-        # For wheel, files are extracted directly
-        extracted_dirs = [d for d in extract_path.iterdir() if d.is_dir()]
-
-        if len(extracted_dirs) == 1:
-            # Return the single extracted directory
-            return extracted_dirs[0]
-        else:
-            # Return the extraction path itself (for wheels)
-            return extract_path
+        self._track_temp_dir(download_path)
+
+        # Stream the artifact to disk rather than buffering it in memory. The
+        # suffix tells the comparator how to read it.
+        suffix = ".tar.gz" if download_url.endswith(".tar.gz") else ".whl"
+        artifact_file = download_path / f"artifact{suffix}"
+        with http.session().get(download_url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            with open(artifact_file, "wb") as f:
+                for chunk in response.iter_content(chunk_size=_DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
+        return artifact_file
 
     def cleanup(self) -> None:
         """
@@ -376,5 +758,13 @@ class HybridRetriever:
 
         This should be called when the retriever is no longer needed.
         """
+        if self._owned_download_executor is not None:
+            self._owned_download_executor.shutdown(wait=True)
+            self._owned_download_executor = None
         cleanup_temp_dirs(self._temp_dirs)
-        self._temp_dirs.clear()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.cleanup()
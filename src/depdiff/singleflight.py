@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SingleFlight(Generic[K, V]):
+    """
+    Runs each keyed piece of work at most once, sharing the outcome.
+
+    The first caller for a key does the work; concurrent and later callers
+    for the same key wait for and receive the same result. If the work
+    fails, callers already waiting receive the same exception, but the key
+    is then forgotten so the next caller tries again. Results are kept for
+    the lifetime of the object.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._futures: Dict[K, Future[V]] = {}
+
+    def do(self, key: K, fn: Callable[[], V]) -> V:
+        """
+        Returns the outcome of the work for a key, running it if needed.
+
+        Args:
+            key: Identifies the piece of work.
+            fn: Does the work. Only called if no caller has claimed the key.
+
+        Returns:
+            The value returned by whichever call ran the work.
+
+        Raises:
+            Exception: Whatever the work raised, for the call that ran it and
+                any callers that were waiting on it.
+        """
+        with self._lock:
+            future = self._futures.get(key)
+            owner = future is None
+            if future is None:
+                future = Future()
+                self._futures[key] = future
+
+        if owner:
+            try:
+                future.set_result(fn())
+            except Exception as e:
+                # Failures are often transient, so do not hand this one to
+                # callers that arrive after it
+                with self._lock:
+                    del self._futures[key]
+                future.set_exception(e)
+
+        return future.result()
@@ -1,9 +1,14 @@
-from typing import Dict, List, Optional
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 from textual.app import App, ComposeResult
-from textual.containers import Horizontal, VerticalScroll
+from textual.content import Content
+from textual.containers import Horizontal, Vertical, VerticalScroll
 from textual.widgets import Header, Footer, ListView, ListItem, Static, Label
-from textual.worker import Worker, WorkerState
+from textual.worker import Worker, WorkerState, get_current_worker
 from textual.binding import Binding
+from textual.reactive import reactive
+from textual.timer import Timer
 from rich.syntax import Syntax
 from rich.text import Text
 
@@ -11,45 +16,150 @@ from depdiff.models import DependencyChange
 from depdiff.parallel import ParallelRetriever
 
 
+# Packages mounted before the first paint; the rest are appended after mount
+_INITIAL_ITEMS = 50
+
+# Diffs longer than this are shown as separate chunks of _CHUNK_LINES lines,
+# so only the chunks scrolled into view are ever highlighted and rendered
+_CHUNKED_MIN_LINES = 1000
+_CHUNK_LINES = 200
+
+# Highlight changes this close together are coalesced into one viewer render,
+# so holding an arrow key only renders the package it stops on
+_HIGHLIGHT_DEBOUNCE = 0.05
+
+
+def _count_lines(diff: str) -> int:
+    """Counts a diff's lines without building a list of them."""
+    if not diff:
+        return 0
+    return diff.count("\n") + (not diff.endswith("\n"))
+
+
+@dataclass(slots=True)
+class FetchResult:
+    """
+    The outcome of fetching one package's diff.
+
+    A fetch either failed, in which case error is set, or produced diff along
+    with its line count.
+    """
+
+    name: str
+    diff: str = ""
+    line_count: int = 0
+    error: Optional[str] = None
+
+
+def _cache_key(change: DependencyChange) -> Tuple[str, Optional[str], Optional[str]]:
+    """Returns the key identifying a change's diff in the app's diff cache."""
+    return change.name, change.old_version, change.new_version
+
+
 class PackageItem(ListItem):
+    _STATUS_ICONS = {"pending": "⏳", "loading": "🔄", "done": "✅", "error": "❌"}
+
+    # One of pending, loading, done, error; mirrored as the item's CSS class
+    status = reactive("pending")
+
     def __init__(self, change: DependencyChange):
         super().__init__()
         self.change = change
-        self.status = "pending"  # pending, loading, done, error
         self.line_count: Optional[int] = None
-        self._label = Label(self._get_display_text())
+        # The name and versions never change, so only the icon and line count
+        # are formatted on each status update
+        self._prefix = f"{change.name}\n  {change.old_version} -> {change.new_version}"
+        self._label = Label(Content(self._get_display_text()))
 
     def _get_display_text(self) -> str:
-        status_icon = (
-            "⏳"
-            if self.status == "pending"
-            else "🔄"
-            if self.status == "loading"
-            else "✅"
-            if self.status == "done"
-            else "❌"
-        )
-        line_info = f"  {self.line_count} lines" if self.line_count is not None else ""
-        return f"{status_icon} {self.change.name}\n  {self.change.old_version} -> {self.change.new_version}{line_info}"
+        icon = self._STATUS_ICONS.get(self.status, "❌")
+        if self.line_count is None:
+            return f"{icon} {self._prefix}"
+        return f"{icon} {self._prefix}  {self.line_count} lines"
 
     def compose(self) -> ComposeResult:
         yield self._label
 
+    def watch_status(self, old_status: str, new_status: str) -> None:
+        # Swapping the one status class keeps styling to a single transition
+        self.remove_class(old_status)
+        self.add_class(new_status)
+
     def update_status(self, status: str, line_count: Optional[int] = None) -> None:
+        if status == self.status and (
+            line_count is None or line_count == self.line_count
+        ):
+            return
         self.status = status
         if line_count is not None:
             self.line_count = line_count
-        self._label.update(self._get_display_text())
+        # Plain Content spares the label parsing the text as markup each time
+        self._label.update(Content(self._get_display_text()))
+
+
+def _render_diff(diff: str) -> List[Syntax]:
+    """
+    Builds the renderables for a diff.
+
+    Args:
+        diff: The diff text.
+
+    Returns:
+        A single Syntax for most diffs, or one Syntax per _CHUNK_LINES lines
+        for diffs of at least _CHUNKED_MIN_LINES lines, numbered as those lines
+        are in the whole diff.
+    """
+    lines = diff.splitlines(keepends=True)
+    if len(lines) < _CHUNKED_MIN_LINES:
+        return [Syntax(diff, "diff", theme="monokai", line_numbers=True)]
+
+    chunks: List[Syntax] = []
+    for i in range(0, len(lines), _CHUNK_LINES):
+        chunk = lines[i : i + _CHUNK_LINES]
+        # Numbers are right-aligned in a column as wide as the chunk's last
+        # one, so padding narrower chunks on the left lines every chunk's
+        # column up with the one the whole diff needs
+        pad = len(str(len(lines))) - len(str(i + len(chunk)))
+        chunks.append(
+            Syntax(
+                # The final newline is dropped, otherwise rich numbers an
+                # empty line after it
+                "".join(chunk).removesuffix("\n"),
+                "diff",
+                theme="monokai",
+                line_numbers=True,
+                start_line=i + 1,
+                padding=(0, 0, 0, pad),
+            )
+        )
+    return chunks
 
 
 class DiffViewer(VerticalScroll):
     can_focus = True
 
+    def __init__(self, *, id: Optional[str] = None) -> None:
+        super().__init__(id=id)
+        # Rendered diffs keyed by their text, so revisiting a package reuses
+        # its Syntax objects instead of building new ones
+        self._syntax_cache: Dict[str, List[Syntax]] = {}
+        self._content = Static(id="diff-content")
+        # Holds one fixed-height Static per chunk of a long diff. Fixed heights
+        # mean layout never has to render a chunk to measure it.
+        self._chunks = Vertical(id="diff-chunks")
+        self._chunks.display = False
+
     def compose(self) -> ComposeResult:
-        yield Static(id="diff-content")
+        yield self._content
+        yield self._chunks
 
     def update_diff(self, diff: str, status: str = "done") -> None:
-        content = self.query_one("#diff-content", Static)
+        content = self._content
+        if self._chunks.display:
+            self._chunks.remove_children()
+            self._chunks.display = False
+            content.display = True
+
         if status == "loading":
             content.update(Text("Loading diff...", style="bold yellow"))
             return
@@ -64,13 +174,29 @@ class DiffViewer(VerticalScroll):
             return
 
         try:
-            syntax = Syntax(diff, "diff", theme="monokai", line_numbers=True)
-            content.update(syntax)
+            rendered = self._syntax_cache.get(diff)
+            if rendered is None:
+                rendered = _render_diff(diff)
+                self._syntax_cache[diff] = rendered
+            if len(rendered) == 1:
+                content.update(rendered[0])
+            else:
+                self._show_chunks(rendered)
         except Exception as e:
             content.update(Text(f"Error rendering diff: {e}", style="bold red"))
 
         self.scroll_home(animate=False)
 
+    def _show_chunks(self, chunks: List[Syntax]) -> None:
+        widgets = []
+        for chunk in chunks:
+            widget = Static(chunk)
+            widget.styles.height = _count_lines(chunk.code)
+            widgets.append(widget)
+        self._content.display = False
+        self._chunks.display = True
+        self._chunks.mount_all(widgets)
+
 
 class DepDiffApp(App):
     CSS = """
@@ -107,6 +233,11 @@ class DepDiffApp(App):
         padding: 1;
     }
 
+    #diff-chunks {
+        height: auto;
+        padding: 1;
+    }
+
     ListItem {
         padding: 0 1;
         height: 3;
@@ -150,165 +281,209 @@ class DepDiffApp(App):
     ]
 
     def __init__(
-        self, changes: List[DependencyChange], max_workers: Optional[int] = None
+        self,
+        changes: List[DependencyChange],
+        max_workers: Optional[int] = None,
+        auto_refresh: bool = True,
     ):
         super().__init__()
         self.changes = changes
+        # Whether mounting starts fetching diffs; tests turn it off to drive
+        # the app by hand
+        self._auto_refresh = auto_refresh
         self.diffs: Dict[str, str] = {}
         self.statuses: Dict[str, str] = {c.name: "pending" for c in changes}
+        # Successful diffs with their line counts, keyed by (name, old, new).
+        # Refreshing reuses these, so only failed packages are fetched again.
+        self._diff_cache: Dict[
+            Tuple[str, Optional[str], Optional[str]], Tuple[str, int]
+        ] = {}
         self.retriever = ParallelRetriever(max_workers=max_workers)
+        self._highlight_timer: Optional[Timer] = None
 
     def compose(self) -> ComposeResult:
+        # Widgets updated on every result or keypress are kept by reference,
+        # so those paths never have to search the DOM for them
+        self._items: Dict[str, PackageItem] = {
+            c.name: PackageItem(c) for c in self.changes
+        }
+        items = list(self._items.values())
+        self._package_list = ListView(*items[:_INITIAL_ITEMS], id="package-list")
+        self._deferred_items = items[_INITIAL_ITEMS:]
+        self._viewer = DiffViewer(id="diff-viewer")
+        self._status_bar = Static(id="status-bar")
+
         yield Header()
         with Horizontal():
-            yield ListView(*[PackageItem(c) for c in self.changes], id="package-list")
-            yield DiffViewer(id="diff-viewer")
-        yield Static(id="status-bar")
+            yield self._package_list
+            yield self._viewer
+        yield self._status_bar
         yield Footer()
 
     def on_mount(self) -> None:
         self.title = "Dependency Diff Hunter"
         self.sub_title = f"Comparing {len(self.changes)} packages"
-        self.query_one("#package-list").focus()
-        self.action_refresh()
+        self._package_list.focus()
+        if self._deferred_items:
+            self.call_later(self._append_deferred_items)
+        if self._auto_refresh:
+            self.action_refresh()
+
+    def _append_deferred_items(self) -> None:
+        # Items not yet mounted still track their status, so they show the
+        # current state as soon as they are added
+        self._package_list.extend(self._deferred_items)
+        self._deferred_items = []
 
     def action_cursor_up(self) -> None:
-        self.query_one("#package-list", ListView).action_cursor_up()
+        self._package_list.action_cursor_up()
 
     def action_cursor_down(self) -> None:
-        self.query_one("#package-list", ListView).action_cursor_down()
+        self._package_list.action_cursor_down()
 
     def action_scroll_half_up(self) -> None:
-        viewer = self.query_one("#diff-viewer", DiffViewer)
-        step = viewer.size.height // 2
-        viewer.scroll_relative(y=-step, animate=False)
+        step = self._viewer.size.height // 2
+        self._viewer.scroll_relative(y=-step, animate=False)
 
     def action_scroll_half_down(self) -> None:
-        viewer = self.query_one("#diff-viewer", DiffViewer)
-        step = viewer.size.height // 2
-        viewer.scroll_relative(y=step, animate=False)
+        step = self._viewer.size.height // 2
+        self._viewer.scroll_relative(y=step, animate=False)
 
     def action_scroll_page_up(self) -> None:
-        viewer = self.query_one("#diff-viewer", DiffViewer)
-        viewer.scroll_relative(y=-viewer.size.height, animate=False)
+        self._viewer.scroll_relative(y=-self._viewer.size.height, animate=False)
 
     def action_scroll_page_down(self) -> None:
-        viewer = self.query_one("#diff-viewer", DiffViewer)
-        viewer.scroll_relative(y=viewer.size.height, animate=False)
+        self._viewer.scroll_relative(y=self._viewer.size.height, animate=False)
 
     def action_refresh(self) -> None:
-        """Refresh all package diffs."""
+        """Refresh all package diffs, reusing ones that already succeeded."""
         self.diffs.clear()
-        for item in self.query(PackageItem):
-            self.statuses[item.change.name] = "loading"
-            self.fetch_diff(item)
-        self.query_one("#status-bar", Static).update(
-            "Fetching package metadata and diffs..."
-        )
+        pending: List[DependencyChange] = []
+        for name, item in self._items.items():
+            cached = self._diff_cache.get(_cache_key(item.change))
+            if cached is not None:
+                diff, line_count = cached
+                self.diffs[name] = diff
+                self.statuses[name] = "done"
+                item.update_status("done", line_count=line_count)
+                continue
+            self.statuses[name] = "loading"
+            item.update_status("loading")
+            pending.append(item.change)
+
+        if pending:
+            self.fetch_diffs(pending)
+        self._status_bar.update("Fetching package metadata and diffs...")
 
     def _update_viewer(self, item: PackageItem) -> None:
         name = item.change.name
         status = self.statuses.get(name, "pending")
         diff = self.diffs.get(name, "")
 
-        viewer = self.query_one("#diff-viewer", DiffViewer)
         if status == "loading":
-            viewer.update_diff("", status="loading")
+            self._viewer.update_diff("", status="loading")
         elif status == "error":
-            viewer.update_diff(diff, status="error")
+            self._viewer.update_diff(diff, status="error")
         else:
-            viewer.update_diff(diff)
+            self._viewer.update_diff(diff)
 
     def on_list_view_selected(self, event: ListView.Selected) -> None:
         item = event.item
         if isinstance(item, PackageItem):
             self._update_viewer(item)
-            self.query_one("#status-bar", Static).update(
+            self._status_bar.update(
                 f"Package: {item.change.name} ({item.change.old_version} -> {item.change.new_version})"
             )
 
     def on_list_view_highlighted(self, event: ListView.Highlighted) -> None:
         item = event.item
         if isinstance(item, PackageItem):
-            self._update_viewer(item)
-            self.query_one("#status-bar", Static).update(f"Package: {item.change.name}")
+            self._status_bar.update(f"Package: {item.change.name}")
+            # Only render the diff once the highlight has settled
+            if self._highlight_timer is not None:
+                self._highlight_timer.stop()
+            self._highlight_timer = self.set_timer(
+                _HIGHLIGHT_DEBOUNCE, lambda: self._update_viewer(item)
+            )
 
-    def fetch_diff(self, item: PackageItem) -> None:
-        item.update_status("loading")
-        item.add_class("loading")
-        item.remove_class("done", "error")
+    def fetch_diffs(self, changes: List[DependencyChange]) -> None:
+        """Fetch diffs for the given changes in one batch on the retriever."""
         self.run_worker(
-            self._get_diff_task(item.change),
-            name=f"fetch-{item.change.name}",
+            lambda: self._fetch_all(changes),
+            name="fetch-all",
             group="fetchers",
+            thread=True,
         )
 
-    async def _get_diff_task(self, change: DependencyChange) -> tuple[str, str]:
-        import asyncio
+    def _fetch_all(self, changes: List[DependencyChange]) -> None:
+        # Runs on a worker thread. The retriever schedules every package on its
+        # own pool, and each result is handed back to the UI as it finishes,
+        # with its line count already taken so the UI thread never scans it.
+        # Results that arrive once the batch is cancelled are dropped.
+        worker = get_current_worker()
+
+        def on_result(name: str, diff: str) -> None:
+            if not worker.is_cancelled:
+                self.call_from_thread(
+                    self._apply_result,
+                    FetchResult(name, diff=diff, line_count=_count_lines(diff)),
+                )
+
+        def on_error(name: str, error: str) -> None:
+            if not worker.is_cancelled:
+                self.call_from_thread(
+                    self._apply_result, FetchResult(name, error=error)
+                )
+
+        self.retriever.process_changes_parallel(
+            changes, on_result=on_result, on_error=on_error
+        )
 
-        loop = asyncio.get_running_loop()
+    def _apply_result(self, result: FetchResult) -> None:
+        """Show a finished package's diff or error in the list and viewer."""
+        name = result.name
+        item = self._items.get(name)
+        if item is None:
+            return
 
-        def _task():
-            try:
-                return self.retriever._process_single_package(change)
-            except Exception as e:
-                return f"Error: {e}"
+        if result.error is not None:
+            self.diffs[name] = f"Error: {result.error}"
+            self.statuses[name] = "error"
+            item.update_status("error")
+        else:
+            self.diffs[name] = result.diff
+            self.statuses[name] = "done"
+            self._diff_cache[_cache_key(item.change)] = (
+                result.diff,
+                result.line_count,
+            )
+            item.update_status("done", line_count=result.line_count)
 
-        diff = await loop.run_in_executor(None, _task)
-        return change.name, diff
+        # If this item is currently highlighted, update the viewer
+        if self._package_list.highlighted_child == item:
+            self._update_viewer(item)
 
     def on_worker_state_changed(self, event: Worker.StateChanged) -> None:
-        if event.state == WorkerState.SUCCESS:
-            result = event.worker.result
-            if result is None:
-                return
-            name, diff = result
-            self.diffs[name] = diff
-
-            # Calculate line count for the diff
-            line_count = len(diff.splitlines()) if diff else 0
-
-            # Find the item in the list and update its status
-            for item in self.query(PackageItem):
-                if item.change.name == name:
-                    item.remove_class("loading")
-                    if diff.startswith("Error:"):
-                        self.statuses[name] = "error"
-                        item.update_status("error")
-                        item.add_class("error")
-                    else:
-                        self.statuses[name] = "done"
-                        item.update_status("done", line_count=line_count)
-                        item.add_class("done")
-
-                    # If this item is currently highlighted, update the viewer
-                    highlighted_item = self.query_one(
-                        "#package-list", ListView
-                    ).highlighted_child
-                    if highlighted_item == item:
-                        self._update_viewer(item)
-                    break
-        elif event.state == WorkerState.ERROR:
-            name = event.worker.name.replace("fetch-", "")
-            error_msg = f"Worker Error: {event.worker.error}"
+        if event.state != WorkerState.ERROR:
+            return
+        # The batch itself failed, so whatever is still loading never will
+        error_msg = f"Worker Error: {event.worker.error}"
+        for name, item in self._items.items():
+            if self.statuses.get(name) != "loading":
+                continue
             self.diffs[name] = error_msg
             self.statuses[name] = "error"
-            for item in self.query(PackageItem):
-                if item.change.name == name:
-                    item.remove_class("loading")
-                    item.update_status("error")
-                    item.add_class("error")
-                    # If this item is currently highlighted, update the viewer
-                    highlighted_item = self.query_one(
-                        "#package-list", ListView
-                    ).highlighted_child
-                    if highlighted_item == item:
-                        self._update_viewer(item)
-                    break
+            item.update_status("error")
+            # If this item is currently highlighted, update the viewer
+            if self._package_list.highlighted_child == item:
+                self._update_viewer(item)
 
     async def action_quit(self) -> None:
-        self.retriever.cleanup()
+        # Stop the batch and leave before cleaning up, so quitting never waits
+        # on packages that are still running
+        self.workers.cancel_group(self, "fetchers")
         self.exit()
+        await asyncio.to_thread(self.retriever.cleanup, wait=False)
 
 
 if __name__ == "__main__":
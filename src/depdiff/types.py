@@ -1,7 +1,12 @@
+import os
 import pathlib
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from typing import Protocol, Set
 
+# Upper bound on threads used to delete temp directories concurrently
+_CLEANUP_WORKERS = 8
+
 
 class TempDirTracker(Protocol):
     """Protocol for objects that track temporary directories."""
@@ -18,10 +23,44 @@ def cleanup_temp_dirs(temp_dirs: Set[pathlib.Path]) -> None:
     Args:
         temp_dirs: Set of paths to clean up. The set is cleared after cleanup.
     """
-    for temp_dir in temp_dirs:
-        if temp_dir.exists():
-            try:
-                shutil.rmtree(temp_dir)
-            except OSError:
-                # Ignore cleanup errors
-                pass
+    if len(temp_dirs) <= 1:
+        for temp_dir in temp_dirs:
+            _remove_temp_dir(temp_dir)
+    else:
+        # Extracted sdists can be large, so delete them concurrently rather than
+        # waiting on each rmtree in turn
+        workers = min(_CLEANUP_WORKERS, len(temp_dirs))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_remove_temp_dir, temp_dirs))
+    temp_dirs.clear()
+
+
+def _remove_temp_dir(temp_dir: pathlib.Path) -> None:
+    """Remove a temporary directory, ignoring missing paths and errors."""
+    try:
+        _fast_rmtree(temp_dir)
+    except OSError:
+        # Let rmtree clear whatever is left, skipping anything it cannot remove
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _fast_rmtree(path: pathlib.Path) -> None:
+    """
+    Recursively delete a directory tree.
+
+    Entry types come from the directory listing itself, so unlike rmtree no
+    stat call is made per entry. Symlinks are unlinked, never followed.
+
+    Args:
+        path: The directory to delete.
+
+    Raises:
+        OSError: If any entry could not be removed.
+    """
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _fast_rmtree(pathlib.Path(entry.path))
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
@@ -1,101 +1,117 @@
+import difflib
+import io
 import pathlib
-import tempfile
-from typing import Generator
+import tarfile
+import zipfile
 
 import pytest
 
-from depdiff.comparator import SourceComparator
+from depdiff.comparator import SourceComparator, _read_if_text_stream
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def comparator() -> SourceComparator:
-    """Create a SourceComparator instance for testing."""
-    return SourceComparator()
-
-
-@pytest.fixture
-def temp_dirs() -> Generator[tuple[pathlib.Path, pathlib.Path], None, None]:
-    """Create two temporary directories for testing comparisons."""
-    with tempfile.TemporaryDirectory(prefix="old_") as old_dir:
-        with tempfile.TemporaryDirectory(prefix="new_") as new_dir:
-            yield pathlib.Path(old_dir), pathlib.Path(new_dir)
+    """
+    Create a SourceComparator instance for testing.
 
+    The comparator keeps no state, so one instance is shared.
+    """
+    return SourceComparator()
 
-class TestIsBinary:
-    """Tests for the _is_binary method."""
 
-    def test_text_file(
-        self, comparator: SourceComparator, tmp_path: pathlib.Path
-    ) -> None:
-        """Test that text files are identified as non-binary."""
-        # Arrange
-        text_file = tmp_path / "test.txt"
-        text_file.write_text("Hello, world!\nThis is a text file.")
+class TestReadIfTextStream:
+    """Tests for the _read_if_text_stream helper."""
 
+    def test_text_file(self) -> None:
+        """Test that text file contents are returned."""
         # Act
-        result = comparator._is_binary(text_file)
+        result = _read_if_text_stream(io.BytesIO(b"Hello, world!\n"))
 
         # Assert
-        assert result is False
+        assert result == b"Hello, world!\n"
 
-    def test_binary_file(
-        self, comparator: SourceComparator, tmp_path: pathlib.Path
-    ) -> None:
-        """Test that binary files are identified correctly."""
+    def test_large_text_file(self) -> None:
+        """Test that contents past the sniffed prefix are returned too."""
         # Arrange
-        binary_file = tmp_path / "test.bin"
-        binary_file.write_bytes(b"\x00\x01\x02\x03\xff\xfe")
+        content = b"x" * 20000 + b"\n"
 
         # Act
-        result = comparator._is_binary(binary_file)
+        result = _read_if_text_stream(io.BytesIO(content))
 
         # Assert
-        assert result is True
-
-    def test_python_file(
-        self, comparator: SourceComparator, tmp_path: pathlib.Path
-    ) -> None:
-        """Test that Python files are identified as non-binary."""
-        # Arrange
-        py_file = tmp_path / "test.py"
-        py_file.write_text("def hello():\n    print('Hello, world!')\n")
+        assert result == content
 
+    def test_binary_file(self) -> None:
+        """Test that binary files return None."""
         # Act
-        result = comparator._is_binary(py_file)
+        result = _read_if_text_stream(io.BytesIO(b"\x00\x01\x02\x03\xff\xfe"))
 
         # Assert
-        assert result is False
-
-
-class TestCompareDirectories:
-    """Tests for the compare_directories method."""
-
-    def test_identical_directories(
-        self, comparator: SourceComparator, temp_dirs: tuple[pathlib.Path, pathlib.Path]
+        assert result is None
+
+
+def _make_sdist(
+    path: pathlib.Path, top: str, files: dict[str, str | bytes]
+) -> pathlib.Path:
+    """Write a gzipped tarball holding each file under a single top directory."""
+    with tarfile.open(path, "w:gz") as tar:
+        for name, data in files.items():
+            raw = data.encode() if isinstance(data, str) else data
+            info = tarfile.TarInfo(f"{top}/{name}")
+            info.size = len(raw)
+            tar.addfile(info, io.BytesIO(raw))
+    return path
+
+
+# A mix of modified, unchanged, added, deleted, nested and binary files
+OLD_FILES: dict[str, str | bytes] = {
+    "pkg/core.py": "a = 1\nb = 2\n",
+    "pkg/same.py": "same\n",
+    "gone.txt": "Gone\n",
+    "logo.bin": b"\x00\x01",
+}
+NEW_FILES: dict[str, str | bytes] = {
+    "pkg/core.py": "a = 1\nb = 3\n",
+    "pkg/same.py": "same\n",
+    "added.txt": "Fresh\n",
+    "logo.bin": b"\x00\x02",
+}
+EXPECTED_DIFF = (
+    "--- a/gone.txt\n+++ /dev/null\n-Gone\n"
+    "--- /dev/null\n+++ b/added.txt\n+Fresh\n"
+    "--- a/pkg/core.py\n+++ b/pkg/core.py\n@@ -1,2 +1,2 @@\n a = 1\n-b = 2\n+b = 3\n"
+)
+
+
+class TestCompareArchives:
+    """Tests for the compare_archives method."""
+
+    def test_identical_archives(
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
     ) -> None:
-        """Test comparison of identical directories."""
+        """Test comparison of archives with the same contents."""
         # Arrange
-        old_dir, new_dir = temp_dirs
-        (old_dir / "file.txt").write_text("Hello")
-        (new_dir / "file.txt").write_text("Hello")
+        old = _make_sdist(tmp_path / "old.tar.gz", "pkg-1.0", {"file.txt": "Hello"})
+        new = _make_sdist(tmp_path / "new.tar.gz", "pkg-2.0", {"file.txt": "Hello"})
 
         # Act
-        result = comparator.compare_directories(old_dir, new_dir)
+        result = comparator.compare_archives(old, new)
 
         # Assert
         assert result == ""
 
     def test_file_modification(
-        self, comparator: SourceComparator, temp_dirs: tuple[pathlib.Path, pathlib.Path]
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
     ) -> None:
         """Test comparison with a modified file."""
         # Arrange
-        old_dir, new_dir = temp_dirs
-        (old_dir / "file.txt").write_text("Hello\n")
-        (new_dir / "file.txt").write_text("Hello, World\n")
+        old = _make_sdist(tmp_path / "old.tar.gz", "pkg-1.0", {"file.txt": "Hello\n"})
+        new = _make_sdist(
+            tmp_path / "new.tar.gz", "pkg-2.0", {"file.txt": "Hello, World\n"}
+        )
 
         # Act
-        result = comparator.compare_directories(old_dir, new_dir)
+        result = comparator.compare_archives(old, new)
 
         # Assert
         assert "file.txt" in result
@@ -103,15 +119,17 @@ class TestCompareDirectories:
         assert "+Hello, World" in result
 
     def test_file_addition(
-        self, comparator: SourceComparator, temp_dirs: tuple[pathlib.Path, pathlib.Path]
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
     ) -> None:
         """Test comparison with a new file added."""
         # Arrange
-        old_dir, new_dir = temp_dirs
-        (new_dir / "newfile.txt").write_text("New content\n")
+        old = _make_sdist(tmp_path / "old.tar.gz", "pkg-1.0", {})
+        new = _make_sdist(
+            tmp_path / "new.tar.gz", "pkg-2.0", {"newfile.txt": "New content\n"}
+        )
 
         # Act
-        result = comparator.compare_directories(old_dir, new_dir)
+        result = comparator.compare_archives(old, new)
 
         # Assert
         assert "newfile.txt" in result
@@ -119,15 +137,17 @@ class TestCompareDirectories:
         assert "/dev/null" in result
 
     def test_file_deletion(
-        self, comparator: SourceComparator, temp_dirs: tuple[pathlib.Path, pathlib.Path]
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
     ) -> None:
         """Test comparison with a file deleted."""
         # Arrange
-        old_dir, new_dir = temp_dirs
-        (old_dir / "oldfile.txt").write_text("Old content\n")
+        old = _make_sdist(
+            tmp_path / "old.tar.gz", "pkg-1.0", {"oldfile.txt": "Old content\n"}
+        )
+        new = _make_sdist(tmp_path / "new.tar.gz", "pkg-2.0", {})
 
         # Act
-        result = comparator.compare_directories(old_dir, new_dir)
+        result = comparator.compare_archives(old, new)
 
         # Assert
         assert "oldfile.txt" in result
@@ -135,70 +155,252 @@ class TestCompareDirectories:
         assert "/dev/null" in result
 
     def test_nested_directories(
-        self, comparator: SourceComparator, temp_dirs: tuple[pathlib.Path, pathlib.Path]
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
     ) -> None:
-        """Test comparison with nested directory structures."""
+        """Test that nested files are diffed under their relative path."""
         # Arrange
-        old_dir, new_dir = temp_dirs
-
-        # Create nested structure
-        (old_dir / "src").mkdir()
-        (old_dir / "src" / "main.py").write_text("print('v1')\n")
-
-        (new_dir / "src").mkdir()
-        (new_dir / "src" / "main.py").write_text("print('v2')\n")
+        old = _make_sdist(
+            tmp_path / "old.tar.gz", "pkg-1.0", {"src/main.py": "print('v1')\n"}
+        )
+        new = _make_sdist(
+            tmp_path / "new.tar.gz", "pkg-2.0", {"src/main.py": "print('v2')\n"}
+        )
 
         # Act
-        result = comparator.compare_directories(old_dir, new_dir)
+        result = comparator.compare_archives(old, new)
 
         # Assert
-        assert (
-            "src/main.py" in result or "src\\main.py" in result
-        )  # Handle Windows paths
+        assert "--- a/src/main.py\n+++ b/src/main.py\n" in result
         assert "-print('v1')" in result
         assert "+print('v2')" in result
 
     def test_binary_files_ignored(
-        self, comparator: SourceComparator, temp_dirs: tuple[pathlib.Path, pathlib.Path]
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
     ) -> None:
         """Test that binary files are skipped in comparison."""
         # Arrange
-        old_dir, new_dir = temp_dirs
-        (old_dir / "data.bin").write_bytes(b"\x00\x01\x02")
-        (new_dir / "data.bin").write_bytes(b"\x00\x01\x03")
+        old = _make_sdist(
+            tmp_path / "old.tar.gz", "pkg-1.0", {"data.bin": b"\x00\x01\x02"}
+        )
+        new = _make_sdist(
+            tmp_path / "new.tar.gz", "pkg-2.0", {"data.bin": b"\x00\x01\x03"}
+        )
 
         # Act
-        result = comparator.compare_directories(old_dir, new_dir)
+        result = comparator.compare_archives(old, new)
+
+        # Assert
+        assert result == ""
+
+    def test_symlinks_skipped(
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
+    ) -> None:
+        """Test that link members are not diffed."""
+        # Arrange
+        archives = []
+        for name, target in (("old", "a.txt"), ("new", "b.txt")):
+            archive = tmp_path / f"{name}.tar.gz"
+            with tarfile.open(archive, "w:gz") as tar:
+                link = tarfile.TarInfo(f"pkg-{name}/link.txt")
+                link.type = tarfile.SYMTYPE
+                link.linkname = target
+                tar.addfile(link)
+            archives.append(archive)
+
+        # Act
+        result = comparator.compare_archives(*archives)
 
         # Assert
-        # Binary files should not appear in diff
         assert result == ""
 
     def test_multiple_file_changes(
-        self, comparator: SourceComparator, temp_dirs: tuple[pathlib.Path, pathlib.Path]
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
     ) -> None:
-        """Test comparison with multiple types of changes."""
+        """Test that deleted, added and modified files come out in that order."""
         # Arrange
-        old_dir, new_dir = temp_dirs
+        old = _make_sdist(tmp_path / "old.tar.gz", "pkg-1.0", OLD_FILES)
+        new = _make_sdist(tmp_path / "new.tar.gz", "pkg-2.0", NEW_FILES)
 
-        # Modified file
-        (old_dir / "modified.txt").write_text("Old\n")
-        (new_dir / "modified.txt").write_text("New\n")
+        # Act
+        result = comparator.compare_archives(old, new)
+
+        # Assert
+        assert result == EXPECTED_DIFF
 
-        # Deleted file
-        (old_dir / "deleted.txt").write_text("Gone\n")
+    def test_output_order_is_stable(
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
+    ) -> None:
+        """Test that files are diffed in sorted order, not archive order."""
+        # Arrange
+        names = [f"file_{i:02d}.txt" for i in range(20)]
+        old = _make_sdist(
+            tmp_path / "old.tar.gz",
+            "pkg-1.0",
+            {name: f"old {name}\n" for name in reversed(names)},
+        )
+        new = _make_sdist(
+            tmp_path / "new.tar.gz",
+            "pkg-2.0",
+            {name: f"new {name}\n" for name in names},
+        )
 
-        # Added file
-        (new_dir / "added.txt").write_text("Fresh\n")
+        # Act
+        result = comparator.compare_archives(old, new)
+
+        # Assert
+        positions = [result.index(f"--- a/{name}") for name in names]
+        assert positions == sorted(positions)
+
+    def test_output_is_newline_terminated(
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
+    ) -> None:
+        """Test that every diff line, including the last, ends with a newline."""
+        # Arrange
+        old = _make_sdist(tmp_path / "old.tar.gz", "pkg-1.0", {"a.txt": "one\n"})
+        new = _make_sdist(
+            tmp_path / "new.tar.gz", "pkg-2.0", {"a.txt": "two\n", "b.txt": "added"}
+        )
+
+        # Act
+        result = comparator.compare_archives(old, new)
+
+        # Assert
+        # Added files come before modified ones
+        assert "+added\n--- a/a.txt\n" in result
+        assert result.endswith("+two\n")
+        assert "\n\n" not in result
+
+    def test_wheel_matches_sdist(
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
+    ) -> None:
+        """Test that wheels, which have no top directory, diff their contents."""
+        # Arrange
+        archives = []
+        for name, files in (("old", OLD_FILES), ("new", NEW_FILES)):
+            archive = tmp_path / f"{name}.whl"
+            with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+                for path, data in files.items():
+                    zip_ref.writestr(path, data)
+                # Wheels also carry a .dist-info directory beside the package
+                zip_ref.writestr("pkg-1.0.dist-info/METADATA", "Version: 1.0\n")
+            archives.append(archive)
+
+        # Act
+        result = comparator.compare_archives(*archives)
+
+        # Assert
+        assert result == EXPECTED_DIFF
+
+    def test_files_beside_top_directory_dropped(
+        self, comparator: SourceComparator, tmp_path: pathlib.Path
+    ) -> None:
+        """Test that only the single top-level directory is compared."""
+        # Arrange
+        archives = []
+        for name in ("old", "new"):
+            archive = tmp_path / f"{name}.tar.gz"
+            with tarfile.open(archive, "w:gz") as tar:
+                for member_name, data in (
+                    (f"pkg-{name}/module.py", f"{name}\n"),
+                    (f"stray-{name}.txt", "stray\n"),
+                ):
+                    info = tarfile.TarInfo(member_name)
+                    info.size = len(data)
+                    tar.addfile(info, io.BytesIO(data.encode()))
+            archives.append(archive)
+
+        # Act
+        result = comparator.compare_archives(*archives)
+
+        # Assert
+        assert result == "--- a/module.py\n+++ b/module.py\n@@ -1 +1 @@\n-old\n+new\n"
+
+
+class TestGenerateFileDiff:
+    """Tests for the _generate_file_diff method."""
+
+    @pytest.mark.parametrize(
+        ("old", "new"),
+        [
+            ("a\nb\nc\n", "a\nB\nc\n"),
+            ("", "added\n"),
+            ("removed\n", ""),
+            (
+                "".join(f"line {i}\n" for i in range(50)),
+                "".join(f"line {i}\n" for i in range(50) if i not in (3, 30))
+                + "tail\n",
+            ),
+        ],
+    )
+    def test_matches_difflib(
+        self, comparator: SourceComparator, old: str, new: str
+    ) -> None:
+        """Test that the output matches difflib.unified_diff."""
+        # Arrange
+        buf = io.StringIO()
+        expected = "".join(
+            f"{line}\n"
+            for line in difflib.unified_diff(
+                old.splitlines(),
+                new.splitlines(),
+                fromfile="a/file.txt",
+                tofile="b/file.txt",
+                lineterm="",
+            )
+        )
+
+        # Act
+        comparator._generate_file_diff(buf, "file.txt", old.encode(), new.encode())
+
+        # Assert
+        assert buf.getvalue() == expected
+
+    @pytest.mark.parametrize(
+        "separator",
+        ["\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029"],
+    )
+    def test_only_newlines_end_lines(
+        self, comparator: SourceComparator, separator: str
+    ) -> None:
+        """Test that form feeds and Unicode separators stay inside their line."""
+        # Arrange
+        buf = io.StringIO()
+        old = f"# section{separator}one\nkeep\n"
+        new = f"# section{separator}two\nkeep\n"
+
+        # Act
+        comparator._generate_file_diff(buf, "file.py", old.encode(), new.encode())
+
+        # Assert
+        assert buf.getvalue() == (
+            "--- a/file.py\n+++ b/file.py\n@@ -1,2 +1,2 @@\n"
+            f"-# section{separator}one\n+# section{separator}two\n keep\n"
+        )
+
+    def test_carriage_returns_end_lines(self, comparator: SourceComparator) -> None:
+        """Test that CRLF and lone CR line endings split like text-mode reads."""
+        # Arrange
+        buf = io.StringIO()
+
+        # Act
+        comparator._generate_file_diff(buf, "file.txt", b"a\r\nb\rc\n", b"a\nB\nc\n")
+
+        # Assert
+        assert buf.getvalue() == (
+            "--- a/file.txt\n+++ b/file.txt\n@@ -1,3 +1,3 @@\n a\n-b\n+B\n c\n"
+        )
+
+
+class TestGenerateAdditionDiff:
+    """Tests for the _generate_addition_diff method."""
+
+    def test_form_feed_kept_in_line(self, comparator: SourceComparator) -> None:
+        """Test that a form feed does not split an added line in two."""
+        # Arrange
+        buf = io.StringIO()
 
         # Act
-        result = comparator.compare_directories(old_dir, new_dir)
+        comparator._generate_addition_diff(buf, "old.c", b"/* page */\x0cint x;\n")
 
         # Assert
-        assert "modified.txt" in result
-        assert "deleted.txt" in result
-        assert "added.txt" in result
-        assert "-Old" in result
-        assert "+New" in result
-        assert "-Gone" in result
-        assert "+Fresh" in result
+        assert buf.getvalue() == "--- /dev/null\n+++ b/old.c\n+/* page */\x0cint x;\n"
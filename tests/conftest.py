@@ -1,18 +1,74 @@
+import os
 import subprocess
+import sys
 import tempfile
 from pathlib import Path
 
 import pytest
 
+# Where temp files go when DEPDIFF_TEST_TMPFS=1 and it is available
+_SHM_DIR = Path("/dev/shm")
+# Remembers the regular temp directory once temp files are moved to tmpfs.
+# It is kept in the environment so xdist workers inherit the original value.
+_DISK_TMPDIR_ENV = "DEPDIFF_TEST_DISK_TMPDIR"
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """
+    Keep the suite's temp files in memory on Linux if DEPDIFF_TEST_TMPFS=1.
+
+    The git and archive tests write many small files, which on tmpfs avoid the
+    journal and flushes of a disk-backed temp directory. This runs before
+    pytest picks its base temp directory, so tmp_path, tempfile and the git
+    subprocesses all land on /dev/shm. It is opt-in because /dev/shm is often
+    small, e.g. 64 MB in a default Docker container.
+    """
+    if os.environ.get("DEPDIFF_TEST_TMPFS") != "1" or config.option.basetemp:
+        return
+    if sys.platform == "linux" and os.access(_SHM_DIR, os.W_OK | os.X_OK):
+        os.environ.setdefault(_DISK_TMPDIR_ENV, tempfile.gettempdir())
+        tempfile.tempdir = str(_SHM_DIR)
+        os.environ["TMPDIR"] = str(_SHM_DIR)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(
+    tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
+) -> Path:
+    """
+    Point depdiff's persistent caches at a fresh directory for every test.
+
+    Keeps the suite from reading or writing the user's real cache.
+    """
+    cache_dir = tmp_path_factory.mktemp("depdiff_cache")
+    monkeypatch.setenv("DEPDIFF_CACHE_DIR", str(cache_dir))
+    return cache_dir
+
+
+# The localstack commit whose `git show` output the localstack fixture returns
+LOCALSTACK_COMMIT = "6269d348d072"
+
 
 @pytest.fixture(scope="session")
-def localstack_diff() -> str:
+def localstack_diff(request: pytest.FixtureRequest) -> str:
     """
     Clone the localstack repo and return the output of `git show 6269d348d072`.
 
     This is session-scoped to avoid cloning multiple times during the test run.
+    The output is also stored in pytest's cache, keyed by the commit, so later
+    runs skip the clone entirely.
     """
-    with tempfile.TemporaryDirectory() as tmp_dir:
+    # The attribute is missing altogether under -p no:cacheprovider
+    cache = getattr(request.config, "cache", None)
+    cache_key = f"depdiff/localstack_diff/{LOCALSTACK_COMMIT}"
+    if cache is not None:
+        cached = cache.get(cache_key, None)
+        if isinstance(cached, str):
+            return cached
+
+    # The clone is far larger than anything else, so it stays on disk even
+    # when the rest of the suite's temp files are on tmpfs
+    with tempfile.TemporaryDirectory(dir=os.environ.get(_DISK_TMPDIR_ENV)) as tmp_dir:
         repo_path = Path(tmp_dir) / "localstack"
 
         # Clone without blobs or checkout - fetches only commit metadata
@@ -26,15 +82,18 @@ def localstack_diff() -> str:
                 str(repo_path),
             ],
             check=True,
-            capture_output=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
         )
 
         # Get the diff content (fetches only the blobs needed for this commit)
         result = subprocess.run(
-            ["git", "-C", str(repo_path), "show", "6269d348d072"],
+            ["git", "-C", str(repo_path), "show", LOCALSTACK_COMMIT],
             check=True,
             capture_output=True,
             text=True,
         )
 
-        return result.stdout
+    if cache is not None:
+        cache.set(cache_key, result.stdout)
+    return result.stdout
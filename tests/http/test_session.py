@@ -0,0 +1,24 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+
+from depdiff import http
+
+
+def test_session_reused_on_same_thread():
+    assert http.session() is http.session()
+
+
+def test_session_per_thread():
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        other = executor.submit(http.session).result()
+
+    assert other is not http.session()
+
+
+def test_session_retries_transient_errors():
+    adapter = http.session().get_adapter("https://pypi.org/")
+    assert isinstance(adapter, HTTPAdapter)
+
+    assert adapter.max_retries.total == 3
+    assert 503 in adapter.max_retries.status_forcelist
@@ -1,8 +1,11 @@
+import io
 import pathlib
+from typing import Callable
 from unittest.mock import patch
 
 import pytest
 
+from depdiff.models import DependencyChange
 from depdiff.orchestrator import DependencyDiffOrchestrator
 
 
@@ -12,13 +15,7 @@ def orchestrator() -> DependencyDiffOrchestrator:
     return DependencyDiffOrchestrator()
 
 
-class TestDependencyDiffOrchestrator:
-    """Tests for the DependencyDiffOrchestrator class."""
-
-    def test_no_changes(self, orchestrator: DependencyDiffOrchestrator) -> None:
-        """Test processing diff with no dependency changes."""
-        # Arrange
-        diff_input = """
+README_ONLY_DIFF = """
 --- a/README.md
 +++ b/README.md
 @@ -1,1 +1,1 @@
@@ -26,6 +23,39 @@ class TestDependencyDiffOrchestrator:
 +New readme
 """
 
+ADDITION_DIFF = """
+--- a/requirements.txt
++++ b/requirements.txt
+@@ -1,1 +1,2 @@
+ requests==2.25.1
++flask==1.1.2
+"""
+
+REMOVAL_DIFF = """
+--- a/requirements.txt
++++ b/requirements.txt
+@@ -1,2 +1,1 @@
+-flask==1.1.2
+ requests==2.25.1
+"""
+
+
+class TestDependencyDiffOrchestrator:
+    """Tests for the DependencyDiffOrchestrator class."""
+
+    @pytest.mark.parametrize(
+        "diff_input",
+        [
+            pytest.param(README_ONLY_DIFF, id="no-requirement-lines"),
+            # Additions and removals are not processed, only version updates
+            pytest.param(ADDITION_DIFF, id="addition"),
+            pytest.param(REMOVAL_DIFF, id="removal"),
+        ],
+    )
+    def test_no_effective_changes(
+        self, orchestrator: DependencyDiffOrchestrator, diff_input: str
+    ) -> None:
+        """Test that diffs without version updates report no changes."""
         # Act
         result = orchestrator.process_requirements_diff(diff_input)
 
@@ -93,46 +123,6 @@ class TestDependencyDiffOrchestrator:
         assert "mock diff for requests" in result
         assert "mock diff for django" in result
 
-    def test_skips_package_additions(
-        self, orchestrator: DependencyDiffOrchestrator
-    ) -> None:
-        """Test that package additions are skipped."""
-        # Arrange
-        diff_input = """
---- a/requirements.txt
-+++ b/requirements.txt
-@@ -1,1 +1,2 @@
- requests==2.25.1
-+flask==1.1.2
-"""
-
-        # Act
-        result = orchestrator.process_requirements_diff(diff_input)
-
-        # Assert
-        # Should not process additions, so result should indicate no changes
-        assert result == "No dependency changes detected."
-
-    def test_skips_package_removals(
-        self, orchestrator: DependencyDiffOrchestrator
-    ) -> None:
-        """Test that package removals are skipped."""
-        # Arrange
-        diff_input = """
---- a/requirements.txt
-+++ b/requirements.txt
-@@ -1,2 +1,1 @@
--flask==1.1.2
- requests==2.25.1
-"""
-
-        # Act
-        result = orchestrator.process_requirements_diff(diff_input)
-
-        # Assert
-        # Should not process removals, so result should indicate no changes
-        assert result == "No dependency changes detected."
-
     def test_handles_retriever_errors(
         self, orchestrator: DependencyDiffOrchestrator
     ) -> None:
@@ -196,6 +186,61 @@ class TestDependencyDiffOrchestrator:
         # Assert
         assert "DIFF FOR PACKAGE: REQUESTS" in result
 
+    def test_stream_matches_report(
+        self, orchestrator: DependencyDiffOrchestrator
+    ) -> None:
+        """Test that streamed output matches the batch report, in sorted order."""
+        # Arrange
+        diff_input = """
+--- a/requirements.txt
++++ b/requirements.txt
+@@ -1,3 +1,3 @@
+-requests==2.25.1
++requests==2.26.0
+-flask==1.1.2
++flask==2.0.0
+-django==3.1.0
++django==3.2.0
+"""
+        mock_diffs = {
+            "requests": "diff for requests\n",
+            "flask": "diff for flask\n",
+            "django": "diff for django\n",
+        }
+
+        def finish_in_reverse(
+            changes: list[DependencyChange],
+            on_result: Callable[[str, str], None],
+        ) -> dict[str, str]:
+            for name in sorted(mock_diffs, reverse=True):
+                on_result(name, mock_diffs[name])
+            return mock_diffs
+
+        out = io.StringIO()
+
+        with patch.object(
+            orchestrator.parallel_retriever,
+            "process_changes_parallel",
+            side_effect=finish_in_reverse,
+        ):
+            # Act
+            orchestrator.stream_requirements_diff(diff_input, out)
+
+        # Assert
+        expected = orchestrator.reporter.generate_report(mock_diffs)
+        assert out.getvalue() == expected + "\n"
+
+    def test_stream_no_changes(self, orchestrator: DependencyDiffOrchestrator) -> None:
+        """Test streaming a diff with no dependency updates."""
+        # Arrange
+        out = io.StringIO()
+
+        # Act
+        orchestrator.stream_requirements_diff("+flask==1.1.2\n", out)
+
+        # Assert
+        assert out.getvalue() == "No dependency changes detected.\n"
+
     def test_cleanup_called_on_exit(
         self, orchestrator: DependencyDiffOrchestrator
     ) -> None:
@@ -207,6 +252,18 @@ class TestDependencyDiffOrchestrator:
         # Assert
         mock_cleanup.assert_called_once()
 
+    def test_retriever_not_created_without_updates(
+        self, orchestrator: DependencyDiffOrchestrator
+    ) -> None:
+        """Test that a diff with no version updates never builds the retriever."""
+        # Act
+        result = orchestrator.process_requirements_diff("+flask==1.1.2\n")
+        orchestrator.cleanup()
+
+        # Assert
+        assert result == "No dependency changes detected."
+        assert "parallel_retriever" not in vars(orchestrator)
+
     @pytest.mark.vcr
     def test_integration_real_package(
         self, orchestrator: DependencyDiffOrchestrator
@@ -0,0 +1,17 @@
+import pathlib
+
+from depdiff.parallel import ParallelRetriever
+
+
+def test_context_manager_cleans_up(tmp_path: pathlib.Path) -> None:
+    """Test that leaving the context removes tracked temp directories."""
+    # Arrange
+    temp_dir = tmp_path / "artifact"
+    temp_dir.mkdir()
+
+    # Act
+    with ParallelRetriever(max_workers=1) as retriever:
+        retriever.track_temp_dir(temp_dir)
+
+    # Assert
+    assert not temp_dir.exists()
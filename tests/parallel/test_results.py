@@ -0,0 +1,135 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from depdiff.models import DependencyChange
+from depdiff.parallel import ParallelRetriever
+from depdiff.pypi.metadata import Info, PackageMetadata
+from depdiff.retriever import HybridRetriever
+
+
+def _fail_for_flask(self: ParallelRetriever, change: DependencyChange) -> str:
+    if change.name == "flask":
+        raise RuntimeError("no source found")
+    return f"diff for {change.name}"
+
+
+def test_failures_go_to_on_error() -> None:
+    """Test that failed packages are reported through on_error only."""
+    # Arrange
+    changes = [
+        DependencyChange("requests", old_version="2.25.1", new_version="2.26.0"),
+        DependencyChange("flask", old_version="2.0.0", new_version="2.1.0"),
+    ]
+    results: list[tuple[str, str]] = []
+    errors: list[tuple[str, str]] = []
+
+    # Act
+    with (
+        patch.object(ParallelRetriever, "_process_single_package", _fail_for_flask),
+        patch.object(ParallelRetriever, "_prefetch_metadata"),
+        ParallelRetriever(max_workers=2) as retriever,
+    ):
+        diffs = retriever.process_changes_parallel(
+            changes,
+            on_result=lambda name, diff: results.append((name, diff)),
+            on_error=lambda name, error: errors.append((name, error)),
+        )
+
+    # Assert
+    assert results == [("requests", "diff for requests")]
+    assert errors == [("flask", "no source found")]
+    assert diffs["flask"] == "Error: no source found"
+
+
+def test_failures_go_to_on_result_without_on_error() -> None:
+    """Test that without on_error, failures reach on_result as error text."""
+    # Arrange
+    changes = [DependencyChange("flask", old_version="2.0.0", new_version="2.1.0")]
+    results: list[tuple[str, str]] = []
+
+    # Act
+    with (
+        patch.object(ParallelRetriever, "_process_single_package", _fail_for_flask),
+        patch.object(ParallelRetriever, "_prefetch_metadata"),
+        ParallelRetriever(max_workers=1) as retriever,
+    ):
+        retriever.process_changes_parallel(
+            changes, on_result=lambda name, diff: results.append((name, diff))
+        )
+
+    # Assert
+    assert results == [("flask", "Error: no source found")]
+
+
+def _diff_from_metadata(self: HybridRetriever, change: DependencyChange) -> str:
+    assert change.new_version is not None
+    self._fetch_pypi_metadata(change.name, change.new_version)
+    return f"diff for {change.name}"
+
+
+def test_failed_lookup_retried_on_next_run() -> None:
+    """Test that a transient lookup failure does not stick across runs."""
+    # Arrange
+    changes = [DependencyChange("flask", old_version="2.0.0", new_version="2.1.0")]
+    outcomes: list[Exception | PackageMetadata] = [
+        ConnectionError("transient"),
+        PackageMetadata(info=Info(url="https://example.com"), urls=[]),
+    ]
+
+    def fetch(package_name: str, version: str) -> PackageMetadata:
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    # Act
+    with (
+        patch.object(HybridRetriever, "get_diff", _diff_from_metadata),
+        patch("depdiff.retriever.fetch_pypi_metadata", fetch),
+        patch.object(ParallelRetriever, "_prefetch_metadata"),
+        ParallelRetriever(max_workers=1) as retriever,
+    ):
+        first = retriever.process_changes_parallel(changes)
+        second = retriever.process_changes_parallel(changes)
+
+    # Assert
+    assert first == {"flask": "Error: transient"}
+    assert second == {"flask": "diff for flask"}
+
+
+def test_cleanup_wakes_collector_for_queued_packages() -> None:
+    """Test that packages cancelled by cleanup are reported without waiting."""
+    # Arrange
+    changes = [
+        DependencyChange(name, old_version="1.0", new_version="2.0")
+        for name in ("first", "second", "third")
+    ]
+    started = threading.Event()
+    release = threading.Event()
+
+    def process(self: ParallelRetriever, change: DependencyChange) -> str:
+        started.set()
+        release.wait(5)
+        return f"diff for {change.name}"
+
+    with (
+        patch.object(ParallelRetriever, "_process_single_package", process),
+        patch.object(ParallelRetriever, "_prefetch_metadata"),
+    ):
+        retriever = ParallelRetriever(max_workers=1)
+        with ThreadPoolExecutor(max_workers=1) as collector:
+            future = collector.submit(retriever.process_changes_parallel, changes)
+            assert started.wait(5)
+
+            # Act
+            retriever.cleanup(wait=False)
+            release.set()
+            diffs = future.result(timeout=5)
+
+    # Assert
+    assert diffs == {
+        "first": "diff for first",
+        "second": "Error: cancelled before it started",
+        "third": "Error: cancelled before it started",
+    }
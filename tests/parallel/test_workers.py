@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+import pytest
+
+from depdiff.parallel import _default_workers
+
+
+@pytest.mark.parametrize(
+    ("cpu_count", "expected"),
+    [
+        (1, 8),
+        (None, 8),
+        (8, 16),
+        (128, 32),
+    ],
+)
+def test_default_workers_bounds(
+    monkeypatch: pytest.MonkeyPatch, cpu_count: int | None, expected: int
+) -> None:
+    """Test that the default scales with CPUs within [8, 32]."""
+    # Arrange
+    monkeypatch.delenv("DEPDIFF_WORKERS", raising=False)
+
+    # Act
+    with patch("depdiff.parallel.os.cpu_count", return_value=cpu_count):
+        workers = _default_workers()
+
+    # Assert
+    assert workers == expected
+
+
+def test_default_workers_env_override(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that $DEPDIFF_WORKERS overrides the default."""
+    # Arrange
+    monkeypatch.setenv("DEPDIFF_WORKERS", "3")
+
+    # Act & Assert
+    assert _default_workers() == 3
+
+
+@pytest.mark.parametrize("value", ["0", "-2", "many"])
+def test_default_workers_ignores_invalid_override(
+    monkeypatch: pytest.MonkeyPatch, value: str
+) -> None:
+    """Test that invalid $DEPDIFF_WORKERS values fall back to the default."""
+    # Arrange
+    monkeypatch.setenv("DEPDIFF_WORKERS", value)
+
+    # Act
+    with patch("depdiff.parallel.os.cpu_count", return_value=8):
+        workers = _default_workers()
+
+    # Assert
+    assert workers == 16
@@ -1,15 +1,28 @@
 from pathlib import Path
 
+import pytest
+
 from depdiff.models import DependencyChange
 from depdiff.parser import DiffParser
 
 
-def test_parse_update():
+@pytest.fixture(scope="session")
+def parser() -> DiffParser:
+    """Create a DiffParser instance shared by the parser tests."""
+    return DiffParser()
+
+
+@pytest.fixture(scope="session")
+def example_diff_1() -> str:
+    """Read the first example diff once for the whole session."""
+    return (Path(__file__).parent / "examples" / "1.txt").read_text()
+
+
+def test_parse_update(parser: DiffParser):
     diff = """
 - requests==2.25.1
 + requests==2.26.0
 """
-    parser = DiffParser()
     changes = parser.parse(diff)
 
     assert len(changes) == 1
@@ -20,11 +33,10 @@ def test_parse_update():
     )
 
 
-def test_parse_addition():
+def test_parse_addition(parser: DiffParser):
     diff = """
 + flask==2.0.1
 """
-    parser = DiffParser()
     changes = parser.parse(diff)
 
     assert len(changes) == 1
@@ -33,11 +45,10 @@ def test_parse_addition():
     )
 
 
-def test_parse_removal():
+def test_parse_removal(parser: DiffParser):
     diff = """
 - numpy==1.19.5
 """
-    parser = DiffParser()
     changes = parser.parse(diff)
 
     assert len(changes) == 1
@@ -46,14 +57,13 @@ def test_parse_removal():
     )
 
 
-def test_parse_multiple_changes():
+def test_parse_multiple_changes(parser: DiffParser):
     diff = """
 - requests==2.25.1
 + requests==2.26.0
 + flask==2.0.1
 - numpy==1.19.5
 """
-    parser = DiffParser()
     changes = parser.parse(diff)
 
     # Sort by name to ensure order for assertion
@@ -74,7 +84,7 @@ def test_parse_multiple_changes():
     assert changes[2].is_update
 
 
-def test_parse_ignore_irrelevant_lines():
+def test_parse_ignore_irrelevant_lines(parser: DiffParser):
     diff = """
 @@ -1,3 +1,3 @@
  # strict dependency
@@ -82,19 +92,14 @@ def test_parse_ignore_irrelevant_lines():
 +requests==2.26.0
  some unrelated text
 """
-    parser = DiffParser()
     changes = parser.parse(diff)
 
     assert len(changes) == 1
     assert changes[0].name == "requests"
 
 
-def test_integration():
-    source_path = Path(__file__).parent / "examples" / "1.txt"
-    contents = source_path.open().read()
-
-    parser = DiffParser()
-    changes = parser.parse(contents)
+def test_integration(parser: DiffParser, example_diff_1: str):
+    changes = parser.parse(example_diff_1)
 
     assert changes == [
         DependencyChange(
@@ -123,3 +128,63 @@ def test_integration():
             new_version="0.13.0",
         ),
     ]
+
+
+def test_parse_skips_bare_sign_lines(parser: DiffParser):
+    diff = """
+-
++
+-requests==2.25.1
++requests==2.26.0
+"""
+    changes = parser.parse(diff)
+
+    assert changes == [
+        DependencyChange(
+            name="requests",
+            old_version="2.25.1",
+            new_version="2.26.0",
+        )
+    ]
+
+
+def test_parse_pin_with_marker(parser: DiffParser):
+    diff = """
+-requests==2.25.1 ; python_version >= "3.8"
++requests==2.26.0 ; python_version >= "3.8"
+"""
+    changes = parser.parse(diff)
+
+    assert changes == [
+        DependencyChange(
+            name="requests",
+            old_version="2.25.1",
+            new_version="2.26.0",
+        )
+    ]
+
+
+def test_parse_falls_back_for_extras(parser: DiffParser):
+    diff = """
+-requests[socks]==2.25.1
++requests[socks]==2.26.0
+"""
+    changes = parser.parse(diff)
+
+    assert changes == [
+        DependencyChange(
+            name="requests",
+            old_version="2.25.1",
+            new_version="2.26.0",
+        )
+    ]
+
+
+def test_parse_does_not_leak_between_calls(parser: DiffParser):
+    parser.parse("-requests==2.25.1\n+requests==2.26.0\n")
+
+    changes = parser.parse("+flask==2.0.1\n")
+
+    assert changes == [
+        DependencyChange(name="flask", old_version=None, new_version="2.0.1")
+    ]
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from depdiff.pypi.metadata import MetadataClient
@@ -14,3 +16,32 @@ def test_requests():
         "https://files.pythonhosted.org/packages/64/20/2133a092a0e87d1c250fe48704974b73a1341b7e4f800edecf40462a825d/requests-2.9.2.tar.gz",
     ]
     assert metadata.info.url == "http://python-requests.org"
+
+
+def test_cache_hit_skips_request(tmp_path):
+    cache_file = tmp_path / "requests" / "2.9.2.json"
+    cache_file.parent.mkdir()
+    cache_file.write_text(
+        json.dumps(
+            {
+                "info": {"home_page": "https://github.com/psf/requests"},
+                "urls": [{"url": "https://example.com/requests-2.9.2.tar.gz"}],
+            }
+        )
+    )
+    client = MetadataClient(cache_dir=tmp_path)
+
+    # Network is blocked, so this only passes if the cache is used
+    metadata = client.get("requests", "2.9.2")
+
+    assert metadata.urls == ["https://example.com/requests-2.9.2.tar.gz"]
+    assert metadata.info.url == "https://github.com/psf/requests"
+
+
+@pytest.mark.vcr("test_requests.yaml")
+def test_cache_populated_on_miss(tmp_path):
+    client = MetadataClient(cache_dir=tmp_path)
+
+    client.get("requests", "2.9.2")
+
+    assert (tmp_path / "requests" / "2.9.2.json").exists()
@@ -1,3 +1,5 @@
+import io
+
 import pytest
 
 from depdiff.reporter import ReportGenerator
@@ -9,6 +11,18 @@ def reporter() -> ReportGenerator:
     return ReportGenerator()
 
 
+# Deliberately not in alphabetical order
+MULTI_PACKAGE_NAMES = ["zebra", "requests", "apple", "flask", "middle", "django"]
+
+
+@pytest.fixture(scope="module")
+def multi_report() -> str:
+    """Build one report over several packages for the tests that inspect it."""
+    return ReportGenerator().generate_report(
+        {name: f"diff for {name}" for name in MULTI_PACKAGE_NAMES}
+    )
+
+
 class TestReportGenerator:
     """Tests for the ReportGenerator class."""
 
@@ -44,45 +58,21 @@ class TestReportGenerator:
         assert "diff --git a/requests/api.py" in result
         assert "===" in result
 
-    def test_multiple_packages(self, reporter: ReportGenerator) -> None:
+    def test_multiple_packages(self, multi_report: str) -> None:
         """Test generating report for multiple packages."""
-        # Arrange
-        diffs = {
-            "requests": "diff for requests",
-            "flask": "diff for flask",
-            "django": "diff for django",
-        }
-
-        # Act
-        result = reporter.generate_report(diffs)
-
         # Assert
-        assert "DIFF FOR PACKAGE: REQUESTS" in result
-        assert "DIFF FOR PACKAGE: FLASK" in result
-        assert "DIFF FOR PACKAGE: DJANGO" in result
-        assert "diff for requests" in result
-        assert "diff for flask" in result
-        assert "diff for django" in result
+        for name in MULTI_PACKAGE_NAMES:
+            assert f"DIFF FOR PACKAGE: {name.upper()}" in multi_report
+            assert f"diff for {name}" in multi_report
 
-    def test_packages_sorted_alphabetically(self, reporter: ReportGenerator) -> None:
+    def test_packages_sorted_alphabetically(self, multi_report: str) -> None:
         """Test that packages are sorted alphabetically in the report."""
-        # Arrange
-        diffs = {
-            "zebra": "diff for zebra",
-            "apple": "diff for apple",
-            "middle": "diff for middle",
-        }
-
-        # Act
-        result = reporter.generate_report(diffs)
-
         # Assert
-        # Check that apple appears before middle, and middle before zebra
-        apple_pos = result.index("APPLE")
-        middle_pos = result.index("MIDDLE")
-        zebra_pos = result.index("ZEBRA")
-
-        assert apple_pos < middle_pos < zebra_pos
+        positions = [
+            multi_report.index(f"DIFF FOR PACKAGE: {name.upper()}")
+            for name in sorted(MULTI_PACKAGE_NAMES)
+        ]
+        assert positions == sorted(positions)
 
     def test_format_header(self, reporter: ReportGenerator) -> None:
         """Test the header formatting."""
@@ -112,3 +102,41 @@ class TestReportGenerator:
         # Assert
         # After the first package's diff, there should be a blank line
         assert "diff1\n\n" in result
+
+    def test_format_section(self, reporter: ReportGenerator) -> None:
+        """Test formatting a single package section."""
+        # Act
+        section = reporter.format_section("requests", "diff for requests\n\n")
+
+        # Assert
+        assert section == reporter._format_header("requests") + "\ndiff for requests"
+
+    def test_write_section_matches_format_section(
+        self, reporter: ReportGenerator
+    ) -> None:
+        """Test that writing a section to a stream matches formatting it."""
+        # Arrange
+        out = io.StringIO()
+
+        # Act
+        reporter.write_section(out, "requests", "diff for requests\n")
+
+        # Assert
+        assert out.getvalue() == reporter.format_section(
+            "requests", "diff for requests\n"
+        )
+
+    @pytest.mark.parametrize("package_name", ["six", "flask", "a" * 100])
+    def test_header_title_centered(
+        self, reporter: ReportGenerator, package_name: str
+    ) -> None:
+        """Test that any extra padding goes after the title."""
+        # Act
+        title_line = reporter._format_header(package_name).splitlines()[1]
+
+        # Assert
+        title = f" DIFF FOR PACKAGE: {package_name.upper()} "
+        padding = max(0, 80 - len(title))
+        assert title_line == "=" * (padding // 2) + title + "=" * (
+            padding - padding // 2
+        )
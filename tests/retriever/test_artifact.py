@@ -1,3 +1,9 @@
+import multiprocessing
+import pathlib
+import tarfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Generator
 from unittest.mock import patch
 
 import pytest
@@ -7,12 +13,18 @@ from depdiff.models import DependencyChange
 from depdiff.retriever import HybridRetriever
 
 
-@pytest.fixture
-def retriever() -> HybridRetriever:
-    """Create a HybridRetriever instance for testing."""
+@pytest.fixture(scope="module")
+def retriever() -> Generator[HybridRetriever, None, None]:
+    """
+    Create a HybridRetriever shared by this module's tests.
+
+    Tests only patch it within with blocks, which undo themselves, so one
+    instance serves them all. Its temp dirs are removed once the module is done.
+    """
     comparator = SourceComparator()
     # Disable parallel downloads for VCR compatibility
-    return HybridRetriever(comparator, parallel_downloads=False)
+    with HybridRetriever(comparator, parallel_downloads=False) as retriever:
+        yield retriever
 
 
 class TestDownloadArtifact:
@@ -25,10 +37,11 @@ class TestDownloadArtifact:
         result = retriever._download_artifact("six", "1.16.0")
 
         # Assert
-        assert result.exists()
-        assert result.is_dir()
-        # Check that package files exist
-        assert (result / "six.py").exists() or any(result.rglob("six.py"))
+        assert result.is_file()
+        assert result.name.endswith(".tar.gz")
+        # The archive is kept whole rather than extracted
+        with tarfile.open(result, "r:gz") as tar:
+            assert "six-1.16.0/six.py" in tar.getnames()
 
     @pytest.mark.vcr
     def test_download_nonexistent_version(self, retriever: HybridRetriever) -> None:
@@ -59,6 +72,71 @@ class TestArtifactFallback:
         # The diff should contain changes
         assert len(result) > 0
 
+    def test_artifact_fallback_with_diff_executor(self, tmp_path: pathlib.Path) -> None:
+        """Test that the comparison runs on the provided executor."""
+        # Arrange
+        archives = []
+        for version in (1, 2):
+            source = tmp_path / f"pkg-{version}.0.0"
+            source.mkdir()
+            (source / "module.py").write_text(f"VERSION = {version}\n")
+            archive = tmp_path / f"pkg-{version}.0.0.tar.gz"
+            with tarfile.open(archive, "w:gz") as tar:
+                tar.add(source, arcname=source.name)
+            archives.append(archive)
+
+        change = DependencyChange(
+            name="test-package",
+            old_version="1.0.0",
+            new_version="2.0.0",
+        )
+
+        with ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context("spawn")
+        ) as diff_executor:
+            retriever = HybridRetriever(
+                SourceComparator(),
+                parallel_downloads=False,
+                diff_executor=diff_executor,
+            )
+            with patch.object(retriever, "_download_artifact", side_effect=archives):
+                # Act
+                result = retriever._artifact_fallback(change)
+
+        # Assert
+        assert "-VERSION = 1" in result
+        assert "+VERSION = 2" in result
+
+    def test_parallel_downloads_reuse_one_thread(self, tmp_path: pathlib.Path) -> None:
+        """Test that old versions download on the same thread every time."""
+        # Arrange
+        archives = {}
+        for version in ("1", "2"):
+            archive = tmp_path / f"pkg-{version}.tar.gz"
+            with tarfile.open(archive, "w:gz"):
+                pass
+            archives[version] = archive
+        threads: list[tuple[str, threading.Thread]] = []
+
+        def download(package_name: str, version: str) -> pathlib.Path:
+            threads.append((version, threading.current_thread()))
+            return archives[version]
+
+        change = DependencyChange(name="test-package", old_version="1", new_version="2")
+
+        with HybridRetriever(SourceComparator()) as retriever:
+            with patch.object(retriever, "_download_artifact", side_effect=download):
+                # Act
+                for _ in range(3):
+                    retriever._artifact_fallback(change)
+
+        # Assert
+        old_threads = {thread for version, thread in threads if version == "1"}
+        new_threads = {thread for version, thread in threads if version == "2"}
+        assert len(old_threads) == 1
+        assert new_threads == {threading.current_thread()}
+        assert not old_threads & new_threads
+
     def test_artifact_fallback_with_addition(self, retriever: HybridRetriever) -> None:
         """Test that artifact fallback raises error for package additions."""
         # Arrange
@@ -100,10 +178,12 @@ class TestGetDiff:
 
         expected_diff = "git diff output"
 
-        with patch.object(retriever, "_try_git_strategy", return_value=expected_diff):
-            with patch.object(retriever, "_artifact_fallback") as mock_fallback:
-                # Act
-                result = retriever.get_diff(change)
+        with (
+            patch.object(retriever, "_try_git_strategy", return_value=expected_diff),
+            patch.object(retriever, "_artifact_fallback") as mock_fallback,
+        ):
+            # Act
+            result = retriever.get_diff(change)
 
         # Assert
         assert result == expected_diff
@@ -120,12 +200,12 @@ class TestGetDiff:
 
         expected_diff = "artifact diff output"
 
-        with patch.object(retriever, "_try_git_strategy", return_value=None):
-            with patch.object(
-                retriever, "_artifact_fallback", return_value=expected_diff
-            ):
-                # Act
-                result = retriever.get_diff(change)
+        with (
+            patch.object(retriever, "_try_git_strategy", return_value=None),
+            patch.object(retriever, "_artifact_fallback", return_value=expected_diff),
+        ):
+            # Act
+            result = retriever.get_diff(change)
 
         # Assert
         assert result == expected_diff
@@ -148,3 +228,23 @@ class TestGetDiff:
         # Assert
         assert isinstance(result, str)
         assert len(result) > 0
+
+
+class TestCleanup:
+    """Tests for temp directory cleanup."""
+
+    def test_context_manager_removes_temp_dirs(self, tmp_path: pathlib.Path) -> None:
+        """Test that leaving the context removes every tracked directory."""
+        # Arrange
+        temp_dirs = [tmp_path / f"artifact-{i}" for i in range(3)]
+        for temp_dir in temp_dirs:
+            (temp_dir / "pkg").mkdir(parents=True)
+            (temp_dir / "pkg" / "module.py").write_text("pass\n")
+
+        # Act
+        with HybridRetriever(SourceComparator()) as retriever:
+            for temp_dir in temp_dirs:
+                retriever._track_temp_dir(temp_dir)
+
+        # Assert
+        assert not any(temp_dir.exists() for temp_dir in temp_dirs)
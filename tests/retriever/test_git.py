@@ -1,6 +1,7 @@
+import os
 import pathlib
+import shutil
 import subprocess
-import tempfile
 from typing import Generator
 from unittest.mock import patch
 
@@ -9,127 +10,335 @@ import pytest
 from depdiff.comparator import SourceComparator
 from depdiff.models import DependencyChange
 from depdiff.pypi.metadata import Info, PackageMetadata
-from depdiff.retriever import HybridRetriever
+from depdiff.retriever import HybridRetriever, _canonical_git_url
+from depdiff.singleflight import SingleFlight
+
+# Keeps fixture git commands independent of the developer's git setup, and
+# spares each of them reading the global and system config files
+GIT_ENV = {
+    **os.environ,
+    "GIT_CONFIG_GLOBAL": os.devnull,
+    "GIT_CONFIG_SYSTEM": os.devnull,
+    "GIT_OPTIONAL_LOCKS": "0",
+    "GIT_TERMINAL_PROMPT": "0",
+}
+
+
+def _git(repo: pathlib.Path, *args: str, input: str | None = None) -> None:
+    """Run a git command whose output is not needed, keeping stderr for failures."""
+    subprocess.run(
+        # -C instead of cwd= spares the child a chdir, and skipping optional
+        # locks stops status-like commands from refreshing the index
+        ["git", "--no-optional-locks", "-C", str(repo), *args],
+        input=input,
+        text=True,
+        env=GIT_ENV,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
+
+
+def _tag(repo: pathlib.Path, *names: str) -> None:
+    """Create lightweight tags at HEAD, all with a single git call."""
+    if names:
+        _git(
+            repo,
+            "update-ref",
+            "--stdin",
+            input="".join(f"create refs/tags/{name} HEAD\n" for name in names),
+        )
 
 
 @pytest.fixture
-def retriever() -> HybridRetriever:
-    """Create a HybridRetriever instance for testing."""
+def retriever() -> Generator[HybridRetriever, None, None]:
+    """Create a HybridRetriever instance for testing, removing its temp dirs after."""
     comparator = SourceComparator()
-    return HybridRetriever(comparator)
+    with HybridRetriever(comparator) as retriever:
+        yield retriever
 
 
-@pytest.fixture
-def temp_git_repo() -> Generator[pathlib.Path, None, None]:
+@pytest.fixture(scope="session")
+def canonical_git_repo(tmp_path_factory: pytest.TempPathFactory) -> pathlib.Path:
     """
-    Create a temporary Git repository for testing.
+    Create the Git repository that temp_git_repo copies, once per session.
 
     Sets up a repository with:
     - Initial commit with a requirements.txt file
     - Tags for version 1.0.0 and v2.0.0
     """
-    with tempfile.TemporaryDirectory(prefix="test_git_repo_") as tmpdir:
-        repo_path = pathlib.Path(tmpdir)
+    repo_path = tmp_path_factory.mktemp("canonical_git_repo")
+
+    # One shell runs the whole setup rather than one subprocess.run per step.
+    # 1.0.0 has no v prefix; v2.0.0 does. allowFilter lets file:// fetches
+    # honour --filter=blob:none, as GitHub does, rather than ignoring it.
+    script = """
+    set -e
+    git init -q
+    git config user.name 'Test User'
+    git config user.email test@example.com
+    git config uploadpack.allowFilter true
+    echo 'requests==2.25.1' > requirements.txt
+    git add requirements.txt
+    git commit -qm 'Initial commit'
+    git tag 1.0.0
+    echo 'requests==2.26.0' > requirements.txt
+    git commit -qam 'Update requests version'
+    git tag v2.0.0
+    """
+    subprocess.run(
+        ["sh", "-c", script],
+        cwd=repo_path,
+        env=GIT_ENV,
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+    )
 
-        # Initialize git repository
-        subprocess.run(
-            ["git", "init"],
-            cwd=repo_path,
-            check=True,
-            capture_output=True,
-        )
+    return repo_path
 
-        # Configure git user for commits
-        subprocess.run(
-            ["git", "config", "user.name", "Test User"],
-            cwd=repo_path,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "config", "user.email", "test@example.com"],
-            cwd=repo_path,
-            check=True,
-            capture_output=True,
-        )
 
-        # Create initial requirements.txt
-        requirements_file = repo_path / "requirements.txt"
-        requirements_file.write_text("requests==2.25.1\n")
+@pytest.fixture
+def temp_git_repo(
+    canonical_git_repo: pathlib.Path, tmp_path: pathlib.Path
+) -> pathlib.Path:
+    """
+    Create a temporary Git repository for testing.
 
-        # Create initial commit
-        subprocess.run(
-            ["git", "add", "requirements.txt"],
-            cwd=repo_path,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "commit", "-m", "Initial commit"],
-            cwd=repo_path,
+    Each test gets its own copy of canonical_git_repo, so tests that add
+    commits or tags never affect each other, and git runs only once to build it.
+    """
+    repo_path = tmp_path / "test_git_repo"
+    shutil.copytree(canonical_git_repo, repo_path, symlinks=True)
+    return repo_path
+
+
+@pytest.fixture
+def cloneable_git_repo(temp_git_repo: pathlib.Path) -> str:
+    """
+    Convert temp_git_repo to a file:// URL that can be cloned.
+    """
+    return f"file://{temp_git_repo}"
+
+
+@pytest.fixture
+def local_repo_metadata(temp_git_repo: pathlib.Path) -> PackageMetadata:
+    """
+    PyPI metadata whose GitHub project URL stands for temp_git_repo.
+
+    Tests pair it with a patched _clone_repo returning temp_git_repo.
+    """
+    return PackageMetadata(
+        info=Info(url=f"https://github.com/{temp_git_repo}"), urls=[]
+    )
+
+
+class TestCloneRepo:
+    """Tests for the _clone_repo method."""
+
+    def test_successful_clone(
+        self, retriever: HybridRetriever, cloneable_git_repo: str
+    ) -> None:
+        """Test successful git clone operation with a real repository."""
+        # Act
+        result = retriever._clone_repo(cloneable_git_repo)
+        tags = retriever._fetch_tags(result, ["1.0.0", "2.0.0"])
+
+        # Assert
+        assert result.exists()
+        assert result.is_dir()
+        # Clones are bare, so there is no working tree
+        assert (result / "HEAD").exists()
+        assert not (result / "requirements.txt").exists()
+        assert tags == ["1.0.0", "v2.0.0"]
+        assert "+requests==2.26.0" in retriever._git_diff(result, "1.0.0", "v2.0.0")
+        # Only the requested tags are fetched, not branch heads
+        refs = subprocess.run(
+            ["git", "for-each-ref", "--format=%(refname)"],
+            cwd=result,
             check=True,
             capture_output=True,
+            text=True,
         )
+        assert refs.stdout.splitlines() == ["refs/tags/1.0.0", "refs/tags/v2.0.0"]
 
-        # Tag as version 1.0.0 (without v prefix)
-        subprocess.run(
-            ["git", "tag", "1.0.0"],
-            cwd=repo_path,
+    def test_clone_spawns_init_only(
+        self, retriever: HybridRetriever, cloneable_git_repo: str
+    ) -> None:
+        """Test that the remote is configured without fetching anything."""
+        # Act
+        with patch(
+            "depdiff.retriever.subprocess.run", wraps=subprocess.run
+        ) as mock_run:
+            result = retriever._clone_repo(cloneable_git_repo)
+
+        # Assert
+        commands = [call.args[0][1] for call in mock_run.call_args_list]
+        assert commands == ["init"]
+        url = subprocess.run(
+            ["git", "config", "remote.origin.url"],
+            cwd=result,
             check=True,
             capture_output=True,
+            text=True,
         )
+        assert url.stdout.strip() == cloneable_git_repo
+
+    def test_fetch_is_shallow(
+        self, retriever: HybridRetriever, cloneable_git_repo: str
+    ) -> None:
+        """Test that only the tagged commits are fetched, without history."""
+        # Arrange
+        repo_path = retriever._clone_repo(cloneable_git_repo)
 
-        # Update requirements.txt
-        requirements_file.write_text("requests==2.26.0\n")
+        # Act
+        retriever._fetch_tags(repo_path, ["2.0.0"])
 
-        # Create second commit
-        subprocess.run(
-            ["git", "add", "requirements.txt"],
+        # Assert
+        commits = subprocess.run(
+            ["git", "rev-list", "--all"],
             cwd=repo_path,
             check=True,
             capture_output=True,
+            text=True,
         )
-        subprocess.run(
-            ["git", "commit", "-m", "Update requests version"],
+        assert len(commits.stdout.splitlines()) == 1
+
+    def test_fetch_is_blobless(
+        self, retriever: HybridRetriever, cloneable_git_repo: str
+    ) -> None:
+        """Test that file contents are left on the remote until needed."""
+        # Arrange
+        repo_path = retriever._clone_repo(cloneable_git_repo)
+
+        # Act
+        retriever._fetch_tags(repo_path, ["2.0.0"])
+
+        # Assert
+        objects = subprocess.run(
+            ["git", "rev-list", "--objects", "--missing=print", "--all"],
             cwd=repo_path,
             check=True,
             capture_output=True,
+            text=True,
         )
+        missing = [line for line in objects.stdout.splitlines() if line[0] == "?"]
+        assert len(missing) == 1
+
+    def test_clone_is_cached(
+        self,
+        retriever: HybridRetriever,
+        temp_git_repo: pathlib.Path,
+        cloneable_git_repo: str,
+        isolated_cache_dir: pathlib.Path,
+    ) -> None:
+        """Test that a second clone reuses the cache and fetches new tags."""
+        # Arrange
+        first = retriever._clone_repo(cloneable_git_repo)
+        retriever._fetch_tags(first, ["1.0.0"])
+        _tag(temp_git_repo, "3.0.0")
+
+        # Act
+        second = retriever._clone_repo(cloneable_git_repo)
+        tags = retriever._fetch_tags(second, ["1.0.0", "3.0.0"])
 
-        # Tag as version v2.0.0 (with v prefix)
-        subprocess.run(
-            ["git", "tag", "v2.0.0"],
+        # Assert
+        assert second == first
+        assert second.is_relative_to(isolated_cache_dir)
+        assert tags == ["1.0.0", "3.0.0"]
+
+    def test_cached_tags_not_refetched(
+        self, retriever: HybridRetriever, cloneable_git_repo: str
+    ) -> None:
+        """Test that tags already in the cache are resolved without fetching."""
+        # Arrange
+        repo_path = retriever._clone_repo(cloneable_git_repo)
+        retriever._fetch_tags(repo_path, ["1.0.0", "2.0.0"])
+
+        # Act
+        with patch(
+            "depdiff.retriever.subprocess.run", wraps=subprocess.run
+        ) as mock_run:
+            tags = retriever._fetch_tags(repo_path, ["1.0.0", "2.0.0"])
+
+        # Assert
+        assert tags == ["1.0.0", "v2.0.0"]
+        commands = [call.args[0][1] for call in mock_run.call_args_list]
+        assert commands == ["for-each-ref"]
+
+    def test_missing_tag_fetch(
+        self, retriever: HybridRetriever, cloneable_git_repo: str
+    ) -> None:
+        """Test that a version with no matching tag on origin is unresolved."""
+        # Arrange
+        repo_path = retriever._clone_repo(cloneable_git_repo)
+
+        # Act
+        tags = retriever._fetch_tags(repo_path, ["1.0.0", "99.0.0"])
+
+        # Assert
+        assert tags == ["1.0.0", None]
+
+    def test_only_exact_tags_fetched(
+        self,
+        retriever: HybridRetriever,
+        temp_git_repo: pathlib.Path,
+        cloneable_git_repo: str,
+    ) -> None:
+        """Test that tags merely starting with a candidate are not fetched."""
+        # Arrange
+        _tag(temp_git_repo, "1.2", "1.20", "1.2rc1", "v1.2.1")
+        repo_path = retriever._clone_repo(cloneable_git_repo)
+
+        # Act
+        tags = retriever._fetch_tags(repo_path, ["1.2"])
+
+        # Assert
+        assert tags == ["1.2"]
+        local_tags = subprocess.run(
+            ["git", "tag", "--list"],
             cwd=repo_path,
             check=True,
             capture_output=True,
+            text=True,
         )
+        assert local_tags.stdout.split() == ["1.2"]
 
-        yield repo_path
-
+    def test_no_fetch_without_remote_tags(
+        self, retriever: HybridRetriever, cloneable_git_repo: str
+    ) -> None:
+        """Test that nothing is fetched when origin has none of the candidates."""
+        # Arrange
+        repo_path = retriever._clone_repo(cloneable_git_repo)
 
-@pytest.fixture
-def cloneable_git_repo(temp_git_repo: pathlib.Path) -> str:
-    """
-    Convert temp_git_repo to a file:// URL that can be cloned.
-    """
-    return f"file://{temp_git_repo}"
+        # Act
+        with patch(
+            "depdiff.retriever.subprocess.run", wraps=subprocess.run
+        ) as mock_run:
+            tags = retriever._fetch_tags(repo_path, ["99.0.0"])
 
+        # Assert
+        assert tags == [None]
+        commands = [call.args[0][1] for call in mock_run.call_args_list]
+        assert commands == ["for-each-ref", "ls-remote"]
 
-class TestCloneRepo:
-    """Tests for the _clone_repo method."""
+    def test_shared_clone_not_refetched(self, cloneable_git_repo: str) -> None:
+        """Test that a repository cloned earlier in the run is reused as-is."""
+        # Arrange
+        clone_lookups: SingleFlight[str, pathlib.Path] = SingleFlight()
+        first = HybridRetriever(SourceComparator(), clone_lookups=clone_lookups)
+        second = HybridRetriever(SourceComparator(), clone_lookups=clone_lookups)
+        repo_path = first._clone_repo(cloneable_git_repo)
 
-    def test_successful_clone(
-        self, retriever: HybridRetriever, cloneable_git_repo: str
-    ) -> None:
-        """Test successful git clone operation with a real repository."""
         # Act
-        result = retriever._clone_repo(cloneable_git_repo)
+        with patch(
+            "depdiff.retriever.subprocess.run", wraps=subprocess.run
+        ) as mock_run:
+            result = second._clone_repo(cloneable_git_repo + ".git")
 
         # Assert
-        assert result.exists()
-        assert result.is_dir()
-        assert (result / ".git").exists()
-        assert (result / "requirements.txt").exists()
+        assert result == repo_path
+        mock_run.assert_not_called()
 
     @pytest.mark.skip(
         reason="GitHub asks for the user password instead of directly failing"
@@ -146,62 +355,69 @@ class TestCloneRepo:
             retriever._clone_repo(invalid_url)
 
 
-class TestResolveTag:
-    """Tests for the _resolve_tag method."""
+@pytest.mark.parametrize(
+    "git_url",
+    [
+        "https://github.com/pallets/flask",
+        "https://github.com/pallets/flask.git",
+        "https://github.com/pallets/flask/",
+        "https://GitHub.com/pallets/flask.git",
+        "https://www.github.com/pallets/flask",
+    ],
+)
+def test_canonical_git_url(git_url: str) -> None:
+    """Test that spellings of the same repository share a canonical URL."""
+    assert _canonical_git_url(git_url) == "https://github.com/pallets/flask"
 
-    def test_exact_version_match(
-        self, retriever: HybridRetriever, temp_git_repo: pathlib.Path
-    ) -> None:
-        """Test resolving a tag with exact version match."""
-        # Act
-        result = retriever._resolve_tag(temp_git_repo, "1.0.0")
 
-        # Assert
-        assert result == "1.0.0"
+class TestResolveTag:
+    """Tests for the _resolve_tag method."""
 
-    def test_v_prefix_match(
-        self, retriever: HybridRetriever, temp_git_repo: pathlib.Path
+    @pytest.mark.parametrize(
+        ("requested", "expected", "extra_tags"),
+        [
+            pytest.param("1.0.0", "1.0.0", [], id="exact"),
+            pytest.param("2.0.0", "v2.0.0", [], id="v-prefix"),
+            pytest.param("99.99.99", None, [], id="no-match"),
+            pytest.param(
+                "3.0.0", "3.0.0", ["3.0.0", "v3.0.0"], id="prefer-exact-over-v"
+            ),
+            pytest.param("4.0.0", "release-4.0.0", ["release-4.0.0"], id="release"),
+            # A tag nested under a candidate name is not a match
+            pytest.param("5.0.0", None, ["5.0.0/rc1"], id="nested-not-matched"),
+        ],
+    )
+    def test_resolves_tag(
+        self,
+        retriever: HybridRetriever,
+        temp_git_repo: pathlib.Path,
+        requested: str,
+        expected: str | None,
+        extra_tags: list[str],
     ) -> None:
-        """Test resolving a tag with v-prefix when exact match not found."""
-        # Act - requesting 2.0.0 should find v2.0.0
-        result = retriever._resolve_tag(temp_git_repo, "2.0.0")
-
-        # Assert
-        assert result == "v2.0.0"
+        """Test which tag, if any, a version resolves to."""
+        # Arrange
+        _tag(temp_git_repo, *extra_tags)
 
-    def test_no_match(
-        self, retriever: HybridRetriever, temp_git_repo: pathlib.Path
-    ) -> None:
-        """Test resolving a tag that doesn't exist."""
         # Act
-        result = retriever._resolve_tag(temp_git_repo, "99.99.99")
+        result = retriever._resolve_tag(temp_git_repo, requested)
 
         # Assert
-        assert result is None
+        assert result == expected
 
-    def test_prefer_exact_over_v_prefix(
+    def test_versions_resolved_in_one_call(
         self, retriever: HybridRetriever, temp_git_repo: pathlib.Path
     ) -> None:
-        """Test that exact match is preferred over v-prefix match."""
-        # Arrange - add a tag that exists both with and without v prefix
-        subprocess.run(
-            ["git", "tag", "3.0.0"],
-            cwd=temp_git_repo,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "tag", "v3.0.0"],
-            cwd=temp_git_repo,
-            check=True,
-            capture_output=True,
-        )
-
+        """Test that resolving several versions only spawns git once."""
         # Act
-        result = retriever._resolve_tag(temp_git_repo, "3.0.0")
+        with patch(
+            "depdiff.retriever.subprocess.run", wraps=subprocess.run
+        ) as mock_run:
+            tags = retriever._resolve_tags(temp_git_repo, ["1.0.0", "2.0.0", "9.9.9"])
 
         # Assert
-        assert result == "3.0.0"  # Should prefer exact match
+        assert tags == ["1.0.0", "v2.0.0", None]
+        mock_run.assert_called_once()
 
 
 class TestGitDiff:
@@ -245,24 +461,9 @@ class TestGitDiff:
         new_file = temp_git_repo / "setup.py"
         new_file.write_text("from setuptools import setup\nsetup(name='test')\n")
 
-        subprocess.run(
-            ["git", "add", "setup.py"],
-            cwd=temp_git_repo,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "commit", "-m", "Add setup.py"],
-            cwd=temp_git_repo,
-            check=True,
-            capture_output=True,
-        )
-        subprocess.run(
-            ["git", "tag", "3.0.0"],
-            cwd=temp_git_repo,
-            check=True,
-            capture_output=True,
-        )
+        _git(temp_git_repo, "add", "setup.py")
+        _git(temp_git_repo, "commit", "-m", "Add setup.py")
+        _tag(temp_git_repo, "3.0.0")
 
         # Act
         result = retriever._git_diff(temp_git_repo, "v2.0.0", "3.0.0")
@@ -271,6 +472,65 @@ class TestGitDiff:
         assert "setup.py" in result
         assert "+from setuptools import setup" in result
 
+    def test_binary_files_not_diffed(
+        self, retriever: HybridRetriever, temp_git_repo: pathlib.Path
+    ) -> None:
+        """Test that files with binary suffixes are reported but not diffed."""
+        # Arrange - add an image alongside a text change
+        (temp_git_repo / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00")
+        (temp_git_repo / "setup.py").write_text("setup()\n")
+
+        _git(temp_git_repo, "add", "logo.png", "setup.py")
+        _git(temp_git_repo, "commit", "-m", "Add logo")
+        _tag(temp_git_repo, "3.0.0")
+
+        # Act
+        result = retriever._git_diff(temp_git_repo, "v2.0.0", "3.0.0")
+
+        # Assert
+        assert "+setup()" in result
+        assert "Binary files /dev/null and b/logo.png differ" in result
+        assert "PNG" not in result
+
+    def test_binary_stubs_match_git(
+        self, retriever: HybridRetriever, temp_git_repo: pathlib.Path
+    ) -> None:
+        """Test that binary stubs match git's own output, in git's path order."""
+        # Arrange - add, modify, delete and chmod binaries between text changes
+        (temp_git_repo / "a.txt").write_text("first\n")
+        (temp_git_repo / "old.png").write_bytes(b"\x00old")
+        (temp_git_repo / "same.png").write_bytes(b"\x00same")
+        (temp_git_repo / "stays.png").write_bytes(b"\x00v1")
+        _git(temp_git_repo, "add", ".")
+        _git(temp_git_repo, "commit", "-m", "Add files")
+        _tag(temp_git_repo, "3.0.0")
+
+        (temp_git_repo / "a.txt").write_text("second\n")
+        (temp_git_repo / "b.png").write_bytes(b"\x00new")
+        (temp_git_repo / "old.png").unlink()
+        (temp_git_repo / "same.png").chmod(0o755)
+        (temp_git_repo / "stays.png").write_bytes(b"\x00v2")
+        # A rename, which both passes must list as a deletion and an addition
+        (temp_git_repo / "a.txt").rename(temp_git_repo / "z.txt")
+        _git(temp_git_repo, "add", "-A")
+        _git(temp_git_repo, "commit", "-m", "Change files")
+        _tag(temp_git_repo, "4.0.0")
+
+        expected = subprocess.run(
+            ["git", "diff", "--no-renames", "3.0.0", "4.0.0"],
+            cwd=temp_git_repo,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+        # Act
+        result = retriever._git_diff(temp_git_repo, "3.0.0", "4.0.0")
+
+        # Assert
+        assert result == expected
+        assert "Binary files /dev/null and b/b.png differ" in result
+
 
 class TestExtractGitUrl:
     """Tests for the _extract_git_url method."""
@@ -360,11 +620,43 @@ class TestExtractGitUrl:
         assert result is None
 
 
+class TestFetchPypiMetadata:
+    """Tests for the _fetch_pypi_metadata method."""
+
+    def test_shared_lookups_made_once(self) -> None:
+        """Test that retrievers sharing lookups only query PyPI once."""
+        # Arrange
+        metadata = PackageMetadata(info=Info(url=""), urls=[])
+        metadata_lookups: SingleFlight[tuple[str, str], PackageMetadata] = (
+            SingleFlight()
+        )
+        retrievers = [
+            HybridRetriever(SourceComparator(), metadata_lookups=metadata_lookups)
+            for _ in range(2)
+        ]
+
+        with patch(
+            "depdiff.retriever.fetch_pypi_metadata", return_value=metadata
+        ) as mock_fetch:
+            # Act
+            results = [
+                retriever._fetch_pypi_metadata("test-package", "1.0.0")
+                for retriever in retrievers
+            ]
+
+        # Assert
+        assert results == [metadata, metadata]
+        mock_fetch.assert_called_once_with("test-package", "1.0.0")
+
+
 class TestTryGitStrategy:
     """Tests for the _try_git_strategy method."""
 
     def test_successful_git_strategy(
-        self, retriever: HybridRetriever, cloneable_git_repo: str
+        self,
+        retriever: HybridRetriever,
+        temp_git_repo: pathlib.Path,
+        local_repo_metadata: PackageMetadata,
     ) -> None:
         """Test successful Git strategy workflow."""
         # Arrange
@@ -374,22 +666,14 @@ class TestTryGitStrategy:
             new_version="2.0.0",
         )
 
-        # Mock the metadata fetch to return our local git repo
-        mock_metadata = PackageMetadata(
-            info=Info(url=cloneable_git_repo.replace("file://", "https://github.com/")),
-            urls=[],
-        )
-
-        with patch.object(
-            retriever, "_fetch_pypi_metadata", return_value=mock_metadata
+        with (
+            patch.object(
+                retriever, "_fetch_pypi_metadata", return_value=local_repo_metadata
+            ),
+            patch.object(retriever, "_clone_repo", return_value=temp_git_repo),
         ):
-            with patch.object(
-                retriever,
-                "_clone_repo",
-                return_value=pathlib.Path(cloneable_git_repo.replace("file://", "")),
-            ):
-                # Act
-                result = retriever._try_git_strategy(change)
+            # Act
+            result = retriever._try_git_strategy(change)
 
         # Assert
         assert result is not None
@@ -452,7 +736,10 @@ class TestTryGitStrategy:
         assert result is None
 
     def test_git_strategy_missing_old_tag(
-        self, retriever: HybridRetriever, cloneable_git_repo: str
+        self,
+        retriever: HybridRetriever,
+        temp_git_repo: pathlib.Path,
+        local_repo_metadata: PackageMetadata,
     ) -> None:
         """Test that Git strategy returns None when old tag is missing."""
         # Arrange
@@ -462,27 +749,23 @@ class TestTryGitStrategy:
             new_version="2.0.0",
         )
 
-        mock_metadata = PackageMetadata(
-            info=Info(url=cloneable_git_repo.replace("file://", "https://github.com/")),
-            urls=[],
-        )
-
-        with patch.object(
-            retriever, "_fetch_pypi_metadata", return_value=mock_metadata
+        with (
+            patch.object(
+                retriever, "_fetch_pypi_metadata", return_value=local_repo_metadata
+            ),
+            patch.object(retriever, "_clone_repo", return_value=temp_git_repo),
         ):
-            with patch.object(
-                retriever,
-                "_clone_repo",
-                return_value=pathlib.Path(cloneable_git_repo.replace("file://", "")),
-            ):
-                # Act
-                result = retriever._try_git_strategy(change)
+            # Act
+            result = retriever._try_git_strategy(change)
 
         # Assert
         assert result is None
 
     def test_git_strategy_missing_new_tag(
-        self, retriever: HybridRetriever, cloneable_git_repo: str
+        self,
+        retriever: HybridRetriever,
+        temp_git_repo: pathlib.Path,
+        local_repo_metadata: PackageMetadata,
     ) -> None:
         """Test that Git strategy returns None when new tag is missing."""
         # Arrange
@@ -492,21 +775,14 @@ class TestTryGitStrategy:
             new_version="99.0.0",  # This tag doesn't exist
         )
 
-        mock_metadata = PackageMetadata(
-            info=Info(url=cloneable_git_repo.replace("file://", "https://github.com/")),
-            urls=[],
-        )
-
-        with patch.object(
-            retriever, "_fetch_pypi_metadata", return_value=mock_metadata
+        with (
+            patch.object(
+                retriever, "_fetch_pypi_metadata", return_value=local_repo_metadata
+            ),
+            patch.object(retriever, "_clone_repo", return_value=temp_git_repo),
         ):
-            with patch.object(
-                retriever,
-                "_clone_repo",
-                return_value=pathlib.Path(cloneable_git_repo.replace("file://", "")),
-            ):
-                # Act
-                result = retriever._try_git_strategy(change)
+            # Act
+            result = retriever._try_git_strategy(change)
 
         # Assert
         assert result is None
@@ -0,0 +1,93 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from depdiff.singleflight import SingleFlight
+
+
+def test_concurrent_callers_share_one_call() -> None:
+    """Test that concurrent callers for a key wait on a single call."""
+    # Arrange
+    flight: SingleFlight[str, int] = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = 0
+
+    def work() -> int:
+        nonlocal calls
+        calls += 1
+        started.set()
+        release.wait(timeout=5)
+        return 42
+
+    # Act
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(flight.do, "key", work)
+        started.wait(timeout=5)
+        others = [executor.submit(flight.do, "key", work) for _ in range(3)]
+        release.set()
+        results = [first.result()] + [other.result() for other in others]
+
+    # Assert
+    assert results == [42, 42, 42, 42]
+    assert calls == 1
+
+
+def test_keys_are_independent() -> None:
+    """Test that different keys each run their own work."""
+    # Arrange
+    flight: SingleFlight[str, str] = SingleFlight()
+
+    # Act
+    results = [flight.do(key, lambda key=key: key.upper()) for key in ("a", "b")]
+
+    # Assert
+    assert results == ["A", "B"]
+
+
+def test_failure_is_shared_with_waiters() -> None:
+    """Test that callers waiting on a failing call see its exception."""
+    # Arrange
+    flight: SingleFlight[str, int] = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def work() -> int:
+        started.set()
+        release.wait(timeout=5)
+        raise ValueError("boom")
+
+    # Act
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = executor.submit(flight.do, "key", work)
+        started.wait(timeout=5)
+        others = [executor.submit(flight.do, "key", work) for _ in range(3)]
+        release.set()
+
+        # Assert
+        for future in [first, *others]:
+            with pytest.raises(ValueError, match="boom"):
+                future.result()
+
+
+def test_failure_is_retried_by_later_callers() -> None:
+    """Test that a failed key runs the work again for the next caller."""
+    # Arrange
+    flight: SingleFlight[str, int] = SingleFlight()
+    outcomes: list[Exception | int] = [ValueError("transient"), 42]
+
+    def work() -> int:
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    # Act
+    with pytest.raises(ValueError, match="transient"):
+        flight.do("key", work)
+    result = flight.do("key", work)
+
+    # Assert
+    assert result == 42
+    assert flight.do("key", work) == 42
@@ -1,20 +1,31 @@
+import asyncio
+import re
+import threading
+import time
 from typing import Callable
+from unittest.mock import patch
 
 import pytest
+from rich.console import Console
 from textual.pilot import Pilot
+from textual.widgets import ListView
 
 from depdiff.models import DependencyChange
-from depdiff.tui import DepDiffApp, DiffViewer, PackageItem
+from depdiff.tui import (
+    DepDiffApp,
+    DiffViewer,
+    FetchResult,
+    PackageItem,
+    _count_lines,
+    _render_diff,
+)
 
 
 class MockDepDiffApp(DepDiffApp):
     """A testable version of DepDiffApp that doesn't auto-fetch on mount."""
 
-    def on_mount(self) -> None:
-        self.title = "Dependency Diff Hunter"
-        self.sub_title = f"Comparing {len(self.changes)} packages"
-        self.query_one("#package-list").focus()
-        # Skip self.action_refresh() to avoid network calls
+    def __init__(self, changes: list[DependencyChange]) -> None:
+        super().__init__(changes, auto_refresh=False)
 
 
 @pytest.fixture
@@ -28,6 +39,12 @@ def sample_changes() -> list[DependencyChange]:
 
 
 @pytest.fixture
+def package_item(sample_changes: list[DependencyChange]) -> PackageItem:
+    """A fresh PackageItem for the first sample change, which tests may mutate."""
+    return PackageItem(sample_changes[0])
+
+
+@pytest.fixture(scope="session")
 def sample_diff() -> str:
     """A simple diff for testing."""
     return """\
@@ -43,7 +60,7 @@ index 1234567..abcdefg 100644
 """
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def large_diff() -> str:
     """A larger diff for testing scrolling and large content rendering."""
     lines = [
@@ -85,36 +102,92 @@ def app_with_large_diff(
 class TestPackageItem:
     """Unit tests for PackageItem widget."""
 
-    def test_display_text_pending(self, sample_changes: list[DependencyChange]) -> None:
-        item = PackageItem(sample_changes[0])
-        assert item.status == "pending"
-        text = item._get_display_text()
+    def test_display_text_pending(self, package_item: PackageItem) -> None:
+        assert package_item.status == "pending"
+        text = package_item._get_display_text()
         assert "requests" in text
         assert "2.25.1" in text
         assert "2.26.0" in text
 
-    def test_display_text_with_line_count(
-        self, sample_changes: list[DependencyChange]
-    ) -> None:
-        item = PackageItem(sample_changes[0])
-        item.update_status("done", line_count=42)
-        text = item._get_display_text()
+    def test_display_text_with_line_count(self, package_item: PackageItem) -> None:
+        package_item.update_status("done", line_count=42)
+        text = package_item._get_display_text()
         assert "42 lines" in text
 
-    def test_status_icons(self, sample_changes: list[DependencyChange]) -> None:
-        item = PackageItem(sample_changes[0])
+    @pytest.mark.parametrize(
+        ("status", "icon"),
+        [("pending", "⏳"), ("loading", "🔄"), ("done", "✅"), ("error", "❌")],
+    )
+    def test_status_icons(
+        self, package_item: PackageItem, status: str, icon: str
+    ) -> None:
+        package_item.status = status
+        assert icon in package_item._get_display_text()
+
+    def test_status_class_follows_status(self, package_item: PackageItem) -> None:
+        package_item.update_status("loading")
+        assert package_item.has_class("loading")
+
+        package_item.update_status("done", line_count=3)
+        assert package_item.has_class("done")
+        assert not package_item.has_class("loading")
+
+    def test_label_not_parsed_as_markup(self) -> None:
+        item = PackageItem(
+            DependencyChange("[bold]pkg[/bold]", old_version="1.0", new_version="2.0")
+        )
+
+        item.update_status("done", line_count=3)
+
+        assert "[bold]pkg[/bold]" in str(item._label.content)
+
+    def test_unchanged_status_skips_label_update(
+        self, package_item: PackageItem
+    ) -> None:
+        package_item.update_status("done", line_count=3)
+
+        with patch.object(package_item._label, "update") as mock_update:
+            package_item.update_status("done", line_count=3)
+            package_item.update_status("done")
+
+        mock_update.assert_not_called()
+
+
+class TestCountLines:
+    """Unit tests for the _count_lines helper."""
+
+    @pytest.mark.parametrize(
+        "diff",
+        ["", "one line", "one\ntwo\n", "one\ntwo", "\n\n"],
+    )
+    def test_matches_splitlines(self, diff: str) -> None:
+        """Test that the line count agrees with splitlines for diff output."""
+        assert _count_lines(diff) == len(diff.splitlines())
 
-        item.status = "pending"
-        assert "⏳" in item._get_display_text()
 
-        item.status = "loading"
-        assert "🔄" in item._get_display_text()
+class TestRenderDiff:
+    """Unit tests for the diff renderables."""
 
-        item.status = "done"
-        assert "✅" in item._get_display_text()
+    def test_short_diff_not_chunked(self, sample_diff: str) -> None:
+        assert len(_render_diff(sample_diff)) == 1
 
-        item.status = "error"
-        assert "❌" in item._get_display_text()
+    def test_chunk_gutters_line_up(self) -> None:
+        lines = "".join(f"+line {i}\n" for i in range(1500))
+        console = Console(width=80, color_system=None)
+
+        numbers = []
+        code_columns = set()
+        for chunk in _render_diff(lines):
+            with console.capture() as capture:
+                console.print(chunk)
+            for line in capture.get().splitlines():
+                match = re.match(r" *(\d+) ", line)
+                assert match is not None
+                numbers.append(int(match.group(1)))
+                code_columns.add(match.end())
+
+        assert numbers == list(range(1, 1501))
+        assert len(code_columns) == 1
 
 
 class TestSnapshots:
@@ -136,11 +209,7 @@ class TestSnapshots:
         """Snapshot test with a large diff content."""
 
         def setup_viewer(pilot: Pilot[MockDepDiffApp]) -> None:
-            # Update the first item's line count
-            for item in pilot.app.query(PackageItem):
-                if item.change.name == "requests":
-                    item.update_status("done", line_count=205)
-                    break
+            app_with_large_diff._items["requests"].update_status("done", line_count=205)
 
         assert snap_compare(app_with_large_diff, run_before=setup_viewer)
 
@@ -170,10 +239,7 @@ class TestSnapshots:
         app.statuses["requests"] = "loading"
 
         def set_loading(pilot: Pilot[MockDepDiffApp]) -> None:
-            for item in pilot.app.query(PackageItem):
-                if item.change.name == "requests":
-                    item.update_status("loading")
-                    break
+            app._items["requests"].update_status("loading")
 
         assert snap_compare(app, run_before=set_loading)
 
@@ -188,10 +254,7 @@ class TestSnapshots:
         app.statuses["requests"] = "error"
 
         def set_error(pilot: Pilot[MockDepDiffApp]) -> None:
-            for item in pilot.app.query(PackageItem):
-                if item.change.name == "requests":
-                    item.update_status("error")
-                    break
+            app._items["requests"].update_status("error")
             viewer = pilot.app.query_one("#diff-viewer", DiffViewer)
             viewer.update_diff("Error: Failed to fetch package", status="error")
 
@@ -208,10 +271,7 @@ class TestSnapshots:
         app.statuses["requests"] = "done"
 
         def show_empty(pilot: Pilot[MockDepDiffApp]) -> None:
-            for item in pilot.app.query(PackageItem):
-                if item.change.name == "requests":
-                    item.update_status("done", line_count=0)
-                    break
+            app._items["requests"].update_status("done", line_count=0)
             viewer = pilot.app.query_one("#diff-viewer", DiffViewer)
             viewer.update_diff("")
 
@@ -227,10 +287,66 @@ class TestDepDiffAppBehavior:
         app = MockDepDiffApp(sample_changes)
 
         async with app.run_test() as pilot:
+            # press() waits for the key's handlers to finish
             await pilot.press("q")
-            await pilot.pause()
             assert app._exit
 
+    @pytest.mark.asyncio
+    async def test_no_fetch_without_auto_refresh(
+        self, sample_changes: list[DependencyChange]
+    ) -> None:
+        """Test that auto_refresh=False leaves fetching to the caller."""
+        app = MockDepDiffApp(sample_changes)
+
+        with patch.object(app, "fetch_diffs") as mock_fetch:
+            async with app.run_test() as pilot:
+                await pilot.pause()
+
+        mock_fetch.assert_not_called()
+        assert set(app.statuses.values()) == {"pending"}
+
+    @pytest.mark.asyncio
+    async def test_quit_during_fetch(
+        self, sample_changes: list[DependencyChange]
+    ) -> None:
+        """Test that quitting mid-fetch neither blocks nor strands the batch."""
+        started = threading.Event()
+        release = threading.Event()
+        batch_done = threading.Event()
+
+        def process(change: DependencyChange) -> str:
+            started.set()
+            release.wait(5)
+            return ""
+
+        # One worker, so one package is running and the rest are queued
+        app = DepDiffApp(sample_changes, max_workers=1)
+        fetch_all = app._fetch_all
+
+        def tracked_fetch_all(changes: list[DependencyChange]) -> None:
+            try:
+                fetch_all(changes)
+            finally:
+                batch_done.set()
+
+        with (
+            patch.object(app.retriever, "_process_single_package", process),
+            patch.object(app.retriever, "_prefetch_metadata"),
+            patch.object(app, "_fetch_all", tracked_fetch_all),
+        ):
+            async with app.run_test() as pilot:
+                assert await asyncio.to_thread(started.wait, 5)
+                start = time.monotonic()
+                await pilot.press("q")
+                quit_seconds = time.monotonic() - start
+
+            release.set()
+            finished = await asyncio.to_thread(batch_done.wait, 5)
+
+        assert app._exit
+        assert quit_seconds < 2
+        assert finished
+
     @pytest.mark.asyncio
     async def test_scroll_commands(
         self, large_diff: str, sample_changes: list[DependencyChange]
@@ -242,12 +358,127 @@ class TestDepDiffAppBehavior:
             app.diffs["requests"] = large_diff
             app.statuses["requests"] = "done"
 
-            await pilot.press("enter")
+            # Opening the diff and scrolling it should not raise
+            await pilot.press("enter", "d", "u", "space", "b")
+
+    @pytest.mark.asyncio
+    async def test_refresh_reuses_cached_diffs(
+        self, sample_diff: str, sample_changes: list[DependencyChange]
+    ) -> None:
+        """Test that refreshing only fetches packages without a cached diff."""
+        app = MockDepDiffApp(sample_changes)
+        requests_change = sample_changes[0]
+        app._diff_cache[
+            (
+                requests_change.name,
+                requests_change.old_version,
+                requests_change.new_version,
+            )
+        ] = (sample_diff, 9)
+        async with app.run_test() as pilot:
+            with patch.object(app, "fetch_diffs") as mock_fetch:
+                app.action_refresh()
             await pilot.pause()
 
-            # These should not raise
-            await pilot.press("d")
-            await pilot.press("u")
-            await pilot.press("space")
-            await pilot.press("b")
+            mock_fetch.assert_called_once()
+            fetched = [change.name for change in mock_fetch.call_args.args[0]]
+            assert fetched == ["urllib3", "flask"]
+            assert app.diffs["requests"] == sample_diff
+            assert app.statuses["requests"] == "done"
+            item = app.query(PackageItem).first()
+            assert item.line_count == 9
+
+    @pytest.mark.asyncio
+    async def test_apply_result_updates_item(
+        self, sample_diff: str, sample_changes: list[DependencyChange]
+    ) -> None:
+        """Test that a finished result marks its package done and caches it."""
+        app = MockDepDiffApp(sample_changes)
+        async with app.run_test() as pilot:
+            app._apply_result(FetchResult("flask", diff=sample_diff, line_count=9))
+            app._apply_result(FetchResult("urllib3", error="no source found"))
+            await pilot.pause()
+
+        assert app.statuses["flask"] == "done"
+        assert app.statuses["urllib3"] == "error"
+        assert ("flask", "2.0.0", "2.1.0") in app._diff_cache
+        assert not any(key[0] == "urllib3" for key in app._diff_cache)
+        assert app.diffs["urllib3"] == "Error: no source found"
+
+    @pytest.mark.asyncio
+    async def test_highlight_burst_renders_once(
+        self, sample_changes: list[DependencyChange]
+    ) -> None:
+        """Test that rapid navigation only renders the package it stops on."""
+        app = MockDepDiffApp(sample_changes)
+        # A wide window keeps the burst inside it even on a loaded machine
+        with patch("depdiff.tui._HIGHLIGHT_DEBOUNCE", 0.3):
+            async with app.run_test() as pilot:
+                await pilot.pause(0.5)
+                package_list = app.query_one("#package-list", ListView)
+                with patch.object(app, "_update_viewer") as mock_update:
+                    package_list.index = 1
+                    package_list.index = 2
+                    await pilot.pause(0.5)
+
+        mock_update.assert_called_once()
+        assert mock_update.call_args.args[0].change.name == "flask"
+
+    @pytest.mark.asyncio
+    async def test_long_package_list_fully_mounted(self) -> None:
+        """Test that packages past the first screenful are appended after mount."""
+        changes = [
+            DependencyChange(f"pkg{i}", old_version="1.0", new_version="2.0")
+            for i in range(60)
+        ]
+        app = MockDepDiffApp(changes)
+        async with app.run_test() as pilot:
             await pilot.pause()
+            package_list = app.query_one("#package-list", ListView)
+
+            assert len(package_list.children) == 60
+            assert package_list.children[-1] is app._items["pkg59"]
+
+    @pytest.mark.asyncio
+    async def test_long_diff_shown_in_chunks(
+        self, sample_diff: str, sample_changes: list[DependencyChange]
+    ) -> None:
+        """Test that a long diff is split into chunks and a short one is not."""
+        long_diff = "".join(f"+line {i}\n" for i in range(1500))
+        app = MockDepDiffApp(sample_changes)
+        async with app.run_test() as pilot:
+            # Let the initial highlight render before driving the viewer
+            await pilot.pause(0.5)
+            viewer = app.query_one("#diff-viewer", DiffViewer)
+            chunks = viewer.query_one("#diff-chunks")
+            content = viewer.query_one("#diff-content")
+
+            viewer.update_diff(long_diff)
+            await pilot.pause()
+            chunk_heights = [child.styles.height for child in chunks.children]
+            showing_chunks = chunks.display and not content.display
+
+            viewer.update_diff(sample_diff)
+            await pilot.pause()
+
+            assert showing_chunks
+            assert len(chunk_heights) == 8
+            assert chunk_heights[-1] is not None
+            assert chunk_heights[-1].value == 100
+            assert content.display
+            assert not chunks.display
+            assert len(chunks.children) == 0
+
+    @pytest.mark.asyncio
+    async def test_diff_starting_with_error_is_not_a_failure(
+        self, sample_changes: list[DependencyChange]
+    ) -> None:
+        """Test that a real diff whose text starts with "Error:" counts as done."""
+        app = MockDepDiffApp(sample_changes)
+        async with app.run_test() as pilot:
+            app._apply_result(
+                FetchResult("flask", diff="Error: handling\n", line_count=1)
+            )
+            await pilot.pause()
+
+        assert app.statuses["flask"] == "done"
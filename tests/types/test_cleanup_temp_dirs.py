@@ -0,0 +1,65 @@
+import pathlib
+
+from depdiff.types import cleanup_temp_dirs
+
+
+def test_nested_dirs_removed(tmp_path: pathlib.Path) -> None:
+    """Test that every tracked tree is removed, including nested directories."""
+    # Arrange
+    temp_dirs = set()
+    for name in ("old", "new"):
+        nested = tmp_path / name / "pkg" / "sub"
+        nested.mkdir(parents=True)
+        (nested / "module.py").write_text("x = 1\n")
+        (tmp_path / name / "setup.py").write_text("")
+        temp_dirs.add(tmp_path / name)
+    # cleanup_temp_dirs empties the set, so keep the paths to check
+    paths = list(temp_dirs)
+
+    # Act
+    cleanup_temp_dirs(temp_dirs)
+
+    # Assert
+    assert not any(path.exists() for path in paths)
+    assert not temp_dirs
+
+
+def test_symlinks_not_followed(tmp_path: pathlib.Path) -> None:
+    """Test that a symlinked directory is unlinked without touching its target."""
+    # Arrange
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "keep.txt").write_text("keep")
+    temp_dir = tmp_path / "artifact"
+    temp_dir.mkdir()
+    (temp_dir / "link").symlink_to(outside, target_is_directory=True)
+
+    # Act
+    cleanup_temp_dirs({temp_dir})
+
+    # Assert
+    assert not temp_dir.exists()
+    assert (outside / "keep.txt").read_text() == "keep"
+
+
+def test_missing_dir_ignored(tmp_path: pathlib.Path) -> None:
+    """Test that a directory that is already gone is skipped silently."""
+    # Act
+    cleanup_temp_dirs({tmp_path / "gone", tmp_path / "also-gone"})
+
+    # Assert
+    assert not (tmp_path / "gone").exists()
+
+
+def test_set_cleared(tmp_path: pathlib.Path) -> None:
+    """Test that the set is emptied so removed paths are not revisited."""
+    # Arrange
+    temp_dirs = {tmp_path / "old", tmp_path / "new"}
+    for path in temp_dirs:
+        path.mkdir()
+
+    # Act
+    cleanup_temp_dirs(temp_dirs)
+
+    # Assert
+    assert temp_dirs == set()